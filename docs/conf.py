@@ -1,11 +1,14 @@
 # Configuration file for the Sphinx documentation builder.
 
+import importlib.util
 import os
 import sys
 from datetime import datetime
 
-# Add project root to sys.path if needed
-sys.path.insert(0, os.path.abspath(".."))
+# Add project root to sys.path only when the package isn't already
+# importable (e.g. building docs from a checkout without installing it)
+if importlib.util.find_spec("gh_pr_rev_md") is None:
+    sys.path.insert(0, os.path.abspath(".."))
 
 project = "gh-pr-rev-md"
 author = "Peter Souter"
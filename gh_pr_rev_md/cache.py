@@ -0,0 +1,136 @@
+"""On-disk cache for GitHub GraphQL responses.
+
+Re-running the tool against the same PR (e.g. while iterating on a review)
+would otherwise re-fetch every page. Successful responses are stored in a
+SQLite database under the XDG cache directory and reused for a short TTL:
+- $XDG_CACHE_HOME/gh-pr-rev-md/responses.sqlite3 (or ~/.cache/...)
+
+GitHub's GraphQL endpoint does not support conditional requests (ETag /
+If-None-Match), so entries are expired purely by age; expired rows are
+deleted whenever a new response is stored. The database may hold private
+repository content, so it is only readable by its owner.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+_APP_DIR_NAME = "gh-pr-rev-md"
+_CACHE_FILENAME = "responses.sqlite3"
+DEFAULT_TTL_SECONDS = 300
+
+
+def _xdg_cache_home() -> Path:
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return Path(xdg).expanduser()
+    return Path.home() / ".cache"
+
+
+def default_cache_path() -> Path:
+    """Return the default cache database location."""
+    return _xdg_cache_home() / _APP_DIR_NAME / _CACHE_FILENAME
+
+
+class ResponseCache:
+    """TTL cache of GraphQL response bodies keyed by request content.
+
+    Cache failures (unwritable directory, corrupt database) are treated as
+    misses so they never prevent fetching from the API.
+    """
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        # The directory, file and schema are set up once, on first use
+        self._prepared = False
+        self._prepare_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(token: Optional[str], query: str, variables: Dict[str, Any]) -> str:
+        """Build a cache key from the request and the credentials used.
+
+        The token is part of the key because different tokens can see
+        different data (e.g. private repositories).
+        """
+        material = json.dumps(
+            {"token": token or "", "query": query, "variables": variables},
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _prepare(self) -> None:
+        with self._prepare_lock:
+            if self._prepared:
+                return
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Responses can include private repository content, so the
+            # database is created readable by its owner only, like the config
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            conn = sqlite3.connect(self.path, timeout=5)
+            try:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, created REAL NOT NULL, body TEXT NOT NULL)"
+                )
+            finally:
+                conn.close()
+            self._prepared = True
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per operation keeps the cache safe to use from the
+        # client's worker threads
+        if not self._prepared:
+            self._prepare()
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response body for key, or None if absent/expired."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT created, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return None
+
+        if row is None:
+            return None
+        created, body = row
+        if time.time() - created > self.ttl:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        """Store a response body under key, dropping any expired entries."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, created, body) "
+                        "VALUES (?, ?, ?)",
+                        (key, now, json.dumps(data)),
+                    )
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
@@ -3,15 +3,14 @@
 import os
 import re
 import sys
-import webbrowser
 import subprocess  # nosec B404  # Required for git/gh CLI integration
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 
 import click
-import yaml
 
+from .cache import ResponseCache, default_cache_path
 from .config import load_config
 from .formatter import format_comments_as_markdown
 from .git_utils import GitParsingError, GitRepository
@@ -19,8 +18,18 @@ from .github_client import GitHubAPIError, GitHubClient
 
 GITHUB_TOKEN_URL = "https://github.com/settings/tokens/new?scopes=repo,read:org&description=gh-pr-rev-md%20CLI%20(read%20PR%20comments)"  # nosec B105  # URL for token creation, not a password
 
+# Compiled once at import; parse_pr_url and the subprocess fallback run these
+# on every invocation
+_PR_URL_RE = re.compile(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)")
+_SSH_GITHUB_REMOTE_RE = re.compile(r"git@github\.com:([^/]+)/([^/]+?)(?:\.git)?$")
+_HTTPS_GITHUB_REMOTE_RE = re.compile(r"https://github\.com/([^/]+)/([^/]+?)(?:\.git)?$")
 
-def get_current_branch_pr_url_subprocess(token: Optional[str] = None) -> str:
+
+def get_current_branch_pr_url_subprocess(
+    token: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+    include_resolved: bool = False,
+) -> str:
     """Get the PR URL for the current git branch.
 
     Returns the PR URL for the current branch, or raises an exception with a helpful message.
@@ -84,12 +93,10 @@ def get_current_branch_pr_url_subprocess(token: Optional[str] = None) -> str:
         # Handle both SSH and HTTPS URLs
         if remote_url.startswith("git@"):
             # SSH format: git@github.com:owner/repo.git
-            match = re.match(r"git@github\.com:([^/]+)/([^/]+?)(?:\.git)?$", remote_url)
+            match = _SSH_GITHUB_REMOTE_RE.match(remote_url)
         else:
             # HTTPS format: https://github.com/owner/repo.git
-            match = re.match(
-                r"https://github\.com/([^/]+)/([^/]+?)(?:\.git)?$", remote_url
-            )
+            match = _HTTPS_GITHUB_REMOTE_RE.match(remote_url)
 
         if not match:
             raise click.BadParameter(
@@ -104,16 +111,24 @@ def get_current_branch_pr_url_subprocess(token: Optional[str] = None) -> str:
         )
 
     # Use common resolver to find PR URL
-    return _resolve_pr_url(owner, repo, current_branch, "github.com", token)
+    return _resolve_pr_url(
+        owner, repo, current_branch, "github.com", token, client, include_resolved
+    )
 
 
-def get_current_branch_pr_url(token: Optional[str] = None) -> str:
+def get_current_branch_pr_url(
+    token: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+    include_resolved: bool = False,
+) -> str:
     """Get the PR URL for the current git branch using hybrid approach.
 
     Tries native git parsing first, falls back to subprocess calls if needed.
 
     Args:
         token: Optional GitHub token for API calls
+        client: Optional client to reuse for the PR lookup
+        include_resolved: Whether the client will fetch resolved threads
 
     Returns:
         The PR URL for the current branch
@@ -123,17 +138,23 @@ def get_current_branch_pr_url(token: Optional[str] = None) -> str:
     """
     try:
         # Try native git parsing first (fast path)
-        return get_current_branch_pr_url_native(token)
+        return get_current_branch_pr_url_native(token, client, include_resolved)
     except GitParsingError:
         # Fall back to subprocess approach (compatibility path)
-        return get_current_branch_pr_url_subprocess(token)
+        return get_current_branch_pr_url_subprocess(token, client, include_resolved)
 
 
-def get_current_branch_pr_url_native(token: Optional[str] = None) -> str:
+def get_current_branch_pr_url_native(
+    token: Optional[str] = None,
+    client: Optional[GitHubClient] = None,
+    include_resolved: bool = False,
+) -> str:
     """Get the PR URL using native git parsing (no subprocess calls).
 
     Args:
         token: Optional GitHub token for API calls
+        client: Optional client to reuse for the PR lookup
+        include_resolved: Whether the client will fetch resolved threads
 
     Returns:
         The PR URL for the current branch
@@ -153,7 +174,9 @@ def get_current_branch_pr_url_native(token: Optional[str] = None) -> str:
 
         host, owner, repo_name, branch = repo_info
 
-        return _resolve_pr_url(owner, repo_name, branch, host, token)
+        return _resolve_pr_url(
+            owner, repo_name, branch, host, token, client, include_resolved
+        )
     except GitParsingError as e:
         # Re-raise as GitParsingError so the hybrid function can catch it
         raise GitParsingError(f"Native git parsing failed: {e}") from e
@@ -163,8 +186,7 @@ def parse_pr_url(url: str) -> Tuple[str, str, int]:
     """Parse GitHub PR URL to extract owner, repo, and PR number."""
     # Use fullmatch to ensure the entire URL matches the expected pattern
     # and reject URLs with trailing paths (e.g. /pull/123/files)
-    pattern = r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)"
-    match = re.fullmatch(pattern, url.strip())
+    match = _PR_URL_RE.fullmatch(url.strip())
     if not match:
         raise click.BadParameter(
             "Invalid GitHub PR URL format. Expected: https://github.com/owner/repo/pull/123"
@@ -175,14 +197,30 @@ def parse_pr_url(url: str) -> Tuple[str, str, int]:
 
 
 def _resolve_pr_url(
-    owner: str, repo: str, branch: str, host: str, token: Optional[str]
+    owner: str,
+    repo: str,
+    branch: str,
+    host: str,
+    token: Optional[str],
+    client: Optional[GitHubClient] = None,
+    include_resolved: bool = False,
 ) -> str:
-    """Resolve PR URL by trying GitHub API first, then gh CLI; raise on failure."""
+    """Resolve PR URL by trying GitHub API first, then gh CLI; raise on failure.
+
+    When given the client that will fetch the comments, the API lookup also
+    prefetches the PR's first page of review threads into it, saving a
+    request; include_resolved must match that fetch. Without a client, only
+    the small branch lookup query is sent.
+    """
     # Try to find PR using GitHub API if token provided
     if token:
         try:
-            client = GitHubClient(token)
-            pr_number = client.find_pr_by_branch(owner, repo, branch)
+            if client is None:
+                pr_number = GitHubClient(token).find_pr_by_branch(owner, repo, branch)
+            else:
+                pr_number = client.get_pr_by_branch_with_threads(
+                    owner, repo, branch, include_resolved
+                )
             if pr_number:
                 return f"https://{host}/{owner}/{repo}/pull/{pr_number}"
         except GitHubAPIError:
@@ -224,12 +262,17 @@ def _resolve_pr_url(
 
 def generate_filename(owner: str, repo: str, pr_number: int) -> str:
     """Generate default filename for PR review output."""
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime())
     return f"{owner}-{repo}-{timestamp}-pr{pr_number}.md"
 
 
 def _interactive_config_setup() -> None:
     """Interactively create or update the XDG config file."""
+    # Deferred imports: only the interactive setup path needs these
+    import webbrowser
+
+    import yaml
+
     xdg_home = os.environ.get("XDG_CONFIG_HOME")
     base_dir = Path(xdg_home).expanduser() if xdg_home else (Path.home() / ".config")
     app_dir = base_dir / "gh-pr-rev-md"
@@ -314,6 +357,8 @@ def _interactive_config_setup() -> None:
 
 def _print_config() -> None:
     """Print current configuration with token redacted."""
+    import yaml
+
     config = load_config()
     if not config:
         click.echo("No configuration found.")
@@ -376,6 +421,12 @@ def _print_config() -> None:
     default=False,
     help="Create parent directories when using --output-file",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Always fetch from GitHub instead of reusing responses cached in the last few minutes",
+)
 @click.option(
     "--config-print",
     is_flag=True,
@@ -392,6 +443,7 @@ def main(
     output: Optional[bool],
     output_file: Optional[str],
     create_dirs: bool,
+    no_cache: bool,
 ):
     """Fetch GitHub PR review comments and output as markdown.
 
@@ -406,6 +458,8 @@ def main(
     """
     # If requested, run interactive config setup and exit early
     if config_set:
+        import yaml
+
         try:
             _interactive_config_setup()
             sys.exit(0)
@@ -446,10 +500,13 @@ def main(
         click.echo(ctx.get_help())
         ctx.exit()
 
+    cache = None if no_cache else ResponseCache(default_cache_path())
+    client = GitHubClient(token, cache=cache)
+
     # Handle "." argument to use current branch's PR
     if pr_url == ".":
         try:
-            pr_url = get_current_branch_pr_url(token)
+            pr_url = get_current_branch_pr_url(token, client, include_resolved)
         except click.BadParameter as e:
             click.echo(f"Error: {e}", err=True)
             sys.exit(1)
@@ -460,8 +517,6 @@ def main(
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
-    client = GitHubClient(token)
-
     try:
         comments = client.get_pr_review_comments(
             owner, repo, pr_number, include_outdated, include_resolved
@@ -480,7 +535,7 @@ def main(
             try:
                 if create_dirs and file_path.parent != Path("."):
                     file_path.parent.mkdir(parents=True, exist_ok=True)
-                file_path.write_text(markdown_output, encoding="utf-8")
+                file_path.write_bytes(markdown_output.encode("utf-8"))
                 click.echo(f"Output saved to: {file_path.absolute()}")
             except (OSError, PermissionError) as e:
                 click.echo(f"Error writing to file {filename}: {e}", err=True)
@@ -490,7 +545,9 @@ def main(
     except GitHubAPIError as e:
         click.echo(f"Error fetching data from GitHub: {e}", err=True)
         sys.exit(1)
-    except Exception as e:
+    except (OSError, ValueError) as e:
+        # requests' network errors subclass OSError; malformed JSON bodies
+        # raise ValueError. Anything else is a bug and should propagate.
         click.echo(f"An unexpected error occurred: {e}", err=True)
         sys.exit(1)
 
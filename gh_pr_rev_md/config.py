@@ -17,8 +17,6 @@ from pathlib import Path
 from typing import Dict, Any, List
 import os
 
-import yaml
-
 
 _APP_DIR_NAME = "gh-pr-rev-md"
 _CONFIG_FILENAMES = ("config.yaml", "config.yml")
@@ -59,8 +57,14 @@ def _candidate_files() -> List[Path]:
 
 
 def _safe_yaml_load(path: Path) -> Dict[str, Any]:
+    # Imported lazily so CLI startup doesn't pay for yaml when no config exists
+    import yaml
+
+    # The libyaml-backed loader is much faster; fall back when PyYAML was
+    # built without libyaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
-        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        data = yaml.load(path.read_text(encoding="utf-8"), Loader=loader)  # nosec B506  # Safe: loader is CSafeLoader or SafeLoader
         if data is None:
             return {}
         if not isinstance(data, dict):
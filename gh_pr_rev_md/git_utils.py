@@ -2,10 +2,48 @@
 
 import os
 import re
-from configparser import ConfigParser
+import stat
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
+
+# Parsed git config: (section, subsection) -> {key: value}
+# e.g. [remote "origin"] url = ... -> {("remote", "origin"): {"url": ...}}
+_GitConfig = Dict[Tuple[str, str], Dict[str, str]]
+
+# SSH remote: git@github.com:owner/repo.git
+_SSH_REMOTE_RE = re.compile(r"^git@([^:]+):([^/]+)/([^/]+?)(?:\.git)?$")
+# HTTPS remote: https://github.com/owner/repo.git
+_HTTPS_REMOTE_RE = re.compile(r"^https://([^/]+)/([^/]+)/([^/]+?)(?:\.git)?$")
+
+
+def _read_small(path: Path, n: int = 256) -> str:
+    """Read a small text file (HEAD, loose refs) without the buffered IO layer.
+
+    The whole file is read; typical files fit in the first read of n bytes.
+
+    Args:
+        path: File to read
+        n: Number of bytes requested per read
+
+    Returns:
+        Stripped UTF-8 decoded file content
+
+    Raises:
+        OSError: If the file cannot be opened or read
+        UnicodeDecodeError: If the content is not valid UTF-8
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, n)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks).decode("utf-8").strip()
 
 
 class GitParsingError(Exception):
@@ -43,6 +81,13 @@ class GitRepository:
         """
         self.repo_path = Path(path).resolve()
         self.git_dir = self._find_git_dir()
+        # Parsed config keyed by (mtime_ns, size) so repeated lookups skip
+        # re-reading an unchanged file
+        self._config_cache: Optional[Tuple[Tuple[int, int], _GitConfig]] = None
+        # Branch resolved from HEAD (None when detached); HEAD is read once
+        # per instance, _head_loaded records whether that has happened
+        self._head_loaded = False
+        self._head_branch: Optional[str] = None
 
     def _find_git_dir(self) -> Path:
         """Find the .git directory by walking up the directory tree.
@@ -58,9 +103,17 @@ class GitRepository:
         while current_path != current_path.parent:
             git_path = current_path / ".git"
 
-            if git_path.is_dir():
+            # A single stat() distinguishes directory from file, instead of
+            # separate is_dir()/is_file() probes at every level
+            try:
+                mode = os.stat(git_path).st_mode
+            except OSError:
+                current_path = current_path.parent
+                continue
+
+            if stat.S_ISDIR(mode):
                 return git_path
-            elif git_path.is_file():
+            elif stat.S_ISREG(mode):
                 # Handle worktrees: .git file contains "gitdir: /path/to/gitdir"
                 try:
                     content = git_path.read_text(
@@ -69,10 +122,11 @@ class GitRepository:
                     if content.startswith("gitdir: "):
                         gitdir_path = content[8:]  # Remove "gitdir: " prefix
                         if not os.path.isabs(gitdir_path):
-                            gitdir_path = current_path / gitdir_path
-                        gitdir_path = Path(gitdir_path).resolve()
-                        if gitdir_path.is_dir():
-                            return gitdir_path
+                            gitdir_path = os.path.join(current_path, gitdir_path)
+                        # Resolve as a string; only build a Path for the result
+                        gitdir_path = os.path.realpath(gitdir_path)
+                        if os.path.isdir(gitdir_path):
+                            return Path(gitdir_path)
                 except (OSError, UnicodeDecodeError) as e:
                     raise GitParsingError(f"Failed to read .git file: {e}") from e
                 # If .git file exists but doesn't contain valid gitdir, continue searching
@@ -92,26 +146,78 @@ class GitRepository:
         Raises:
             GitParsingError: If HEAD file cannot be read or parsed
         """
+        return self._load_head()
+
+    def _load_head(self) -> Optional[str]:
+        """Read and resolve HEAD once, memoizing the result on the instance.
+
+        HEAD is treated as fixed for the lifetime of a GitRepository, so
+        repeated branch lookups don't touch the filesystem again.
+
+        Returns:
+            Branch name, or None if HEAD is detached
+
+        Raises:
+            GitParsingError: If HEAD file cannot be read
+        """
+        if self._head_loaded:
+            return self._head_branch
+
         head_file = self.git_dir / "HEAD"
 
         try:
-            head_content = head_file.read_text(
-                encoding="utf-8", errors="strict"
-            ).strip()
+            head_content = _read_small(head_file)
         except (OSError, UnicodeDecodeError) as e:
             raise GitParsingError(f"Failed to read HEAD file: {e}") from e
 
-        if head_content.startswith("ref: "):
+        branch: Optional[str] = None
+        prefix, sep, ref_path = head_content.partition("ref: ")
+        if sep and not prefix:
             # Symbolic ref: "ref: refs/heads/branch-name"
-            ref_path = head_content[5:]  # Remove "ref: " prefix
-            if ref_path.startswith("refs/heads/"):
-                return ref_path[11:]  # Remove "refs/heads/" prefix
+            heads_prefix, sep, head_branch = ref_path.partition("refs/heads/")
+            if sep and not heads_prefix:
+                branch = head_branch
             else:
                 # Handle other ref types (tags, remotes, etc.)
-                return ref_path.split("/")[-1]
-        else:
-            # Detached HEAD: direct commit hash
+                branch = ref_path.rpartition("/")[2]
+        # Otherwise detached HEAD: direct commit hash, no branch
+
+        self._head_branch = branch
+        self._head_loaded = True
+        return branch
+
+    def _load_git_config(self) -> Optional[_GitConfig]:
+        """Load and parse the git config, reusing the cached parse if unchanged.
+
+        Returns:
+            Parsed git config mapping, or None if the config file doesn't exist
+
+        Raises:
+            GitParsingError: If config file cannot be read or parsed
+        """
+        config_file = self.git_dir / "config"
+
+        try:
+            st = config_file.stat()
+        except FileNotFoundError:
             return None
+        except OSError as e:
+            raise GitParsingError(f"Failed to read git config: {e}") from e
+
+        key = (st.st_mtime_ns, st.st_size)
+        if self._config_cache is not None and self._config_cache[0] == key:
+            return self._config_cache[1]
+
+        # Stream lines straight from the file rather than materializing the
+        # whole config as one string first
+        try:
+            with open(config_file, encoding="utf-8", errors="strict") as config_lines:
+                config = self._parse_git_config(config_lines)
+        except (OSError, UnicodeDecodeError) as e:
+            raise GitParsingError(f"Failed to read git config: {e}") from e
+
+        self._config_cache = (key, config)
+        return config
 
     def get_remote_url(self, remote_name: Optional[str] = None) -> Optional[str]:
         """Get remote URL for the specified remote or current branch's remote.
@@ -126,29 +232,18 @@ class GitRepository:
         Raises:
             GitParsingError: If config file cannot be read
         """
-        config_file = self.git_dir / "config"
-
-        if not config_file.exists():
+        config = self._load_git_config()
+        if config is None:
             return None
 
-        try:
-            config_content = config_file.read_text(encoding="utf-8", errors="strict")
-        except (OSError, UnicodeDecodeError) as e:
-            raise GitParsingError(f"Failed to read git config: {e}") from e
-
-        config = self._parse_git_config(config_content)
-
         # If no specific remote requested, try to find the best one
         if remote_name is None:
             try:
                 current_branch = self.get_current_branch()
                 if current_branch:
                     # Check if current branch has a configured remote
-                    branch_section = f"branch {current_branch}"
-                    if config.has_section(branch_section) and config.has_option(
-                        branch_section, "remote"
-                    ):
-                        remote_name = config.get(branch_section, "remote")
+                    branch_section = config.get(("branch", current_branch), {})
+                    remote_name = branch_section.get("remote")
             except GitParsingError:
                 # If we can't read current branch, that's okay - we'll fall back to default remotes
                 pass
@@ -158,70 +253,86 @@ class GitRepository:
                 remote_name = "origin"
 
         # Get URL for the remote
-        remote_section = f"remote {remote_name}"
-        if config.has_section(remote_section) and config.has_option(
-            remote_section, "url"
-        ):
-            return config.get(remote_section, "url")
+        url = config.get(("remote", remote_name), {}).get("url")
+        if url is not None:
+            return url
 
         # If specified remote not found and it wasn't 'origin', try 'origin'
         if remote_name != "origin":
-            origin_section = "remote origin"
-            if config.has_section(origin_section) and config.has_option(
-                origin_section, "url"
-            ):
-                return config.get(origin_section, "url")
+            url = config.get(("remote", "origin"), {}).get("url")
+            if url is not None:
+                return url
 
         # Last resort: return first remote found
-        for section_name in config.sections():
-            if section_name.startswith("remote ") and config.has_option(
-                section_name, "url"
-            ):
-                return config.get(section_name, "url")
+        for (section, _), options in config.items():
+            if section == "remote" and "url" in options:
+                return options["url"]
 
         return None
 
-    def _parse_git_config(self, config_content: str) -> ConfigParser:
-        """Parse git config content, handling git-specific section format.
+    def _parse_git_config(self, config_lines: Iterable[str]) -> _GitConfig:
+        """Parse git config lines in a single linear scan.
 
-        Git uses section format like [remote "origin"] which needs to be
-        converted to ConfigParser format [remote origin].
+        Handles git's section format like [remote "origin"] directly, keyed as
+        ("remote", "origin"). Plain sections like [core] use an empty
+        subsection. Section and key names are case-insensitive in git, so they
+        are lowercased; subsection names are kept as-is. When a key repeats
+        within a section the first value wins, matching ``git remote get-url``.
 
         Args:
-            config_content: Raw git config file content
+            config_lines: Raw git config lines, e.g. an open config file
 
         Returns:
-            Parsed ConfigParser object
+            Mapping of (section, subsection) to that section's key/value pairs
 
         Raises:
             GitParsingError: If config cannot be parsed
         """
-        config = ConfigParser()
-
-        try:
-            # Convert git config format to ConfigParser format
-            normalized_content = self._normalize_git_config_format(config_content)
-            config.read_string(normalized_content)
-        except Exception as e:
-            raise GitParsingError(f"Failed to parse git config: {e}") from e
+        config: _GitConfig = {}
+        options: Optional[Dict[str, str]] = None
+
+        for lineno, raw_line in enumerate(config_lines, 1):
+            line = raw_line.strip()
+            if not line or line[0] in "#;":
+                continue
+
+            if line.startswith("["):
+                end = line.find("]")
+                open_quote = line.find('"')
+                subsection = ""
+                if open_quote != -1 and (end == -1 or open_quote < end):
+                    # Quoted subsections may contain "]" (legal in branch
+                    # names), so look for the closing quote first
+                    close_quote = line.find('"', open_quote + 1)
+                    while close_quote != -1 and line[close_quote - 1] == "\\":
+                        close_quote = line.find('"', close_quote + 1)
+                    if close_quote != -1:
+                        subsection = line[open_quote + 1 : close_quote]
+                        end = line.find("]", close_quote)
+                    else:
+                        end = -1
+                    name = line[1:open_quote]
+                else:
+                    name = line[1:end]
+                if end == -1:
+                    raise GitParsingError(
+                        f"Failed to parse git config: malformed section header "
+                        f"on line {lineno}: {line!r}"
+                    )
+                options = config.setdefault((name.strip().lower(), subsection), {})
+                continue
+
+            if options is None:
+                raise GitParsingError(
+                    f"Failed to parse git config: entry outside of a section "
+                    f"on line {lineno}: {line!r}"
+                )
+
+            key, _, value = line.partition("=")
+            options.setdefault(key.strip().lower(), value.strip())
 
         return config
 
-    def _normalize_git_config_format(self, config_content: str) -> str:
-        """Convert git config section format to ConfigParser format.
-
-        Converts [remote "origin"] to [remote origin] so ConfigParser can handle it.
-
-        Args:
-            config_content: Raw git config content
-
-        Returns:
-            Normalized config content for ConfigParser
-        """
-        # Regex to find sections like [type "name"] and replace them
-        section_pattern = re.compile(r'\[\s*([^\[\]\s"]+)\s*"([^"]+)"\s*\]')
-        return section_pattern.sub(r"[\1 \2]", config_content)
-
     def parse_remote_url(self, remote_url: str) -> Optional[RemoteInfo]:
         """Parse a git remote URL to extract repository information.
 
@@ -235,15 +346,13 @@ class GitRepository:
             return None
 
         # Handle SSH format: git@github.com:owner/repo.git
-        ssh_pattern = r"^git@([^:]+):([^/]+)/([^/]+?)(?:\.git)?$"
-        ssh_match = re.match(ssh_pattern, remote_url)
+        ssh_match = _SSH_REMOTE_RE.match(remote_url)
         if ssh_match:
             host, owner, repo = ssh_match.groups()
             return RemoteInfo(host=host, owner=owner, repo=repo, url=remote_url)
 
         # Handle HTTPS format: https://github.com/owner/repo.git
-        https_pattern = r"^https://([^/]+)/([^/]+)/([^/]+?)(?:\.git)?$"
-        https_match = re.match(https_pattern, remote_url)
+        https_match = _HTTPS_REMOTE_RE.match(remote_url)
         if https_match:
             host, owner, repo = https_match.groups()
             return RemoteInfo(host=host, owner=owner, repo=repo, url=remote_url)
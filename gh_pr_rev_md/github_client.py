@@ -1,7 +1,168 @@
 """GitHub API client for fetching PR review comments."""
 
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
 import requests
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+from urllib3.util.retry import Retry
+
+from .cache import ResponseCache
+
+# Upper bound on in-flight requests when paginating several threads at once
+MAX_CONCURRENT_REQUESTS = 8
+# Threads whose extra comment pages are fetched together in one aliased query
+THREADS_PER_REQUEST = 10
+# Comments whose diff hunks are fetched together (GitHub's nodes(ids:) limit)
+HUNKS_PER_REQUEST = 100
+
+# Sort key for formatted comments
+_BY_CREATED_AT = itemgetter("created_at")
+
+# Fields selected for every review comment. diffHunk is selected separately
+# because it is by far the largest field.
+_COMMENT_FIELDS = """
+  id
+  author {
+    login
+  }
+  body
+  createdAt
+  updatedAt
+  path
+  position
+  url
+  line
+"""
+
+
+def _minify_query(query: str) -> str:
+    """Collapse the indentation and newlines of a GraphQL document."""
+    return " ".join(query.split())
+
+
+# One page of review threads, each with its first page of comments
+_REVIEW_THREADS_SELECTION = f"""
+  reviewThreads(first: 100, after: $threadsCursor) {{
+    totalCount
+    pageInfo {{
+      endCursor
+      hasNextPage
+    }}
+    nodes {{
+      id
+      isResolved
+      comments(first: 100) {{
+        pageInfo {{
+          endCursor
+          hasNextPage
+        }}
+        nodes {{{_COMMENT_FIELDS}  diffHunk @include(if: $withHunks)
+        }}
+      }}
+    }}
+  }}
+"""
+
+# Queries are static, so they are minified once here rather than uploading
+# their indentation with every request
+_REVIEW_THREADS_QUERY = _minify_query(
+    f"""
+    query(
+      $owner: String!, $repo: String!, $prNumber: Int!, $threadsCursor: String,
+      $withHunks: Boolean!
+    ) {{
+      repository(owner: $owner, name: $repo) {{
+        pullRequest(number: $prNumber) {{{_REVIEW_THREADS_SELECTION}}}
+      }}
+    }}
+    """
+)
+
+_FIND_PR_QUERY = _minify_query(
+    """
+    query($owner: String!, $repo: String!, $branchName: String!) {
+      repository(owner: $owner, name: $repo) {
+        pullRequests(first: 10, states: [OPEN], headRefName: $branchName) {
+          nodes {
+            number
+            headRefName
+            state
+          }
+        }
+      }
+    }
+    """
+)
+
+# Resolves the branch's open PR and fetches its first page of review threads
+# in the same request
+_FIND_PR_WITH_THREADS_QUERY = _minify_query(
+    f"""
+    query(
+      $owner: String!, $repo: String!, $branchName: String!, $threadsCursor: String,
+      $withHunks: Boolean!
+    ) {{
+      repository(owner: $owner, name: $repo) {{
+        pullRequests(first: 1, states: [OPEN], headRefName: $branchName) {{
+          nodes {{
+            number
+            headRefName
+            state{_REVIEW_THREADS_SELECTION}}}
+        }}
+      }}
+    }}
+    """
+)
+
+# Diff hunks for comments whose threads survived filtering
+_DIFF_HUNKS_QUERY = _minify_query(
+    """
+    query($ids: [ID!]!) {
+      nodes(ids: $ids) {
+        ... on PullRequestReviewComment {
+          id
+          diffHunk
+        }
+      }
+    }
+    """
+)
+
+# (REST-style key, GraphQL field) pairs copied verbatim from each comment
+_KEY_MAP = (
+    ("id", "id"),
+    ("body", "body"),
+    ("created_at", "createdAt"),
+    ("updated_at", "updatedAt"),
+    ("path", "path"),
+    ("diff_hunk", "diffHunk"),
+    ("line", "line"),
+    ("position", "position"),
+    ("html_url", "url"),
+)
+
+
+def _new_session() -> requests.Session:
+    """Create a session with a pooled adapter that retries gateway errors."""
+    session = requests.Session()
+    # Keep enough pooled keep-alive connections for concurrent thread
+    # pagination, and retry transient gateway errors with backoff
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=2 * MAX_CONCURRENT_REQUESTS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["POST", "GET"]),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
 
 
 class GitHubAPIError(Exception):
@@ -13,10 +174,20 @@ class GitHubAPIError(Exception):
 class GitHubClient:
     """Client for interacting with GitHub API."""
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.token = token
+        self.cache = cache
+        # First reviewThreads pages fetched by get_pr_by_branch_with_threads,
+        # keyed by (owner, repo, pr_number), with whether hunks were selected
+        self._prefetched_threads: Dict[
+            Tuple[str, str, int], Tuple[bool, Dict[str, Any]]
+        ] = {}
         self.graphql_url = "https://api.github.com/graphql"
-        self.session = requests.Session()
+        self.session = _new_session()
         headers: Dict[str, str] = {
             "Accept": "application/vnd.github.v3+json",
             "X-GitHub-Api-Version": "2022-11-28",
@@ -35,272 +206,453 @@ class GitHubClient:
         include_resolved: bool = False,
     ) -> List[Dict[str, Any]]:
         """Fetch review comments for a PR using the GraphQL API."""
-        comments = []
-        threads_cursor = None
+        # Each page is sorted in place on its own, then the pages are merged
+        pages = []
+        for page in self._iter_comment_pages(
+            owner, repo, pr_number, include_outdated, include_resolved
+        ):
+            page.sort(key=_BY_CREATED_AT)
+            pages.append(page)
+        if len(pages) == 1:
+            return pages[0]
+        return list(heapq.merge(*pages, key=_BY_CREATED_AT))
+
+    def iter_pr_review_comments(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        include_outdated: bool = False,
+        include_resolved: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield review comments for a PR in the order they are fetched.
 
-        while True:
-            query, variables = self._build_graphql_query(
-                owner, repo, pr_number, threads_cursor
-            )
-            response = self.session.post(
-                self.graphql_url,
-                json={"query": query, "variables": variables},
-                timeout=30,
+        Unlike get_pr_review_comments the comments are not sorted, and at most
+        one page of review threads is fetched ahead of the consumer.
+        """
+        for page in self._iter_comment_pages(
+            owner, repo, pr_number, include_outdated, include_resolved
+        ):
+            yield from page
+
+    def _iter_comment_pages(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        include_outdated: bool,
+        include_resolved: bool,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the formatted comments of each page of review threads.
+
+        As soon as a page arrives the next one is requested in the background,
+        so it is usually ready by the time this page's comments have been
+        paginated and consumed.
+
+        When resolved threads are dropped, pages are requested without diff
+        hunks and the hunks are fetched afterwards for the surviving comments
+        only, so resolved threads' hunks are never downloaded. That costs one
+        extra round-trip per page before it is yielded (a single-page PR takes
+        two requests instead of one); larger pages send their hunk batches
+        concurrently.
+        """
+        with_hunks = include_resolved
+        review_threads = None
+        seeded = self._prefetched_threads.pop((owner, repo, pr_number), None)
+        # A seed requested with different hunk selection would cost more
+        # follow-up requests than it saves, so it is only used if it matches
+        if seeded is not None and seeded[0] == with_hunks:
+            review_threads = seeded[1]
+        if review_threads is None:
+            review_threads = self._fetch_review_threads(
+                owner, repo, pr_number, None, with_hunks
             )
+        # Most PRs have no review threads at all; nothing else to do then
+        if review_threads.get("totalCount") == 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                page_info = review_threads["pageInfo"]
+                next_page = None
+                if page_info["hasNextPage"]:
+                    next_page = executor.submit(
+                        self._fetch_review_threads,
+                        owner,
+                        repo,
+                        pr_number,
+                        page_info["endCursor"],
+                        with_hunks,
+                    )
+
+                # Resolved threads are dropped whole, before any of their
+                # comments are looked at
+                threads = review_threads["nodes"]
+                if not include_resolved:
+                    threads = [thread for thread in threads if not thread["isResolved"]]
+                page_comments = self._get_threads_comments(threads, include_outdated)
+                if not with_hunks:
+                    self._attach_diff_hunks(page_comments)
+                yield page_comments
+
+                if next_page is None:
+                    break
+                review_threads = next_page.result()
+
+    def _fetch_review_threads(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        threads_cursor: Optional[str],
+        with_hunks: bool = True,
+    ) -> Dict[str, Any]:
+        """Fetch one page of a PR's review threads."""
+        query, variables = self._build_graphql_query(
+            owner, repo, pr_number, threads_cursor, with_hunks
+        )
+        data = self._post_graphql(query, variables)
 
-            if response.status_code != 200:
-                raise GitHubAPIError(
-                    f"GitHub API error: {response.status_code} - {response.text}"
-                )
+        try:
+            return data["data"]["repository"]["pullRequest"]["reviewThreads"]
+        except (KeyError, TypeError):
+            # pullRequest is null when the PR doesn't exist
+            raise GitHubAPIError(
+                f"PR #{pr_number} not found in {owner}/{repo}"
+            ) from None
 
-            data = response.json()
-            if "errors" in data:
-                raise GitHubAPIError(f"GitHub GraphQL API error: {data['errors']}")
+    def _attach_diff_hunks(self, comments: List[Dict[str, Any]]) -> None:
+        """Fill in the diff hunks of comments from a page fetched without them.
 
-            pr_data = data.get("data", {}).get("repository", {}).get("pullRequest")
-            if not pr_data:
-                raise GitHubAPIError(f"PR #{pr_number} not found in {owner}/{repo}")
+        Comments from thread continuation pages already carry their hunks.
 
-            review_threads = pr_data.get("reviewThreads", {})
-            for thread in review_threads.get("nodes", []):
-                if not include_resolved and thread.get("isResolved"):
-                    continue
+        Raises:
+            GitHubAPIError: If the response lacks a hunk for any comment
+        """
+        # diffHunk is non-null in the schema, so None means it wasn't selected
+        missing = [comment for comment in comments if comment["diff_hunk"] is None]
+        batches = [
+            missing[i : i + HUNKS_PER_REQUEST]
+            for i in range(0, len(missing), HUNKS_PER_REQUEST)
+        ]
+        if len(batches) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_CONCURRENT_REQUESTS, len(batches))
+            ) as executor:
+                results = list(executor.map(self._fetch_diff_hunks, batches))
+        else:
+            results = [self._fetch_diff_hunks(batch) for batch in batches]
+
+        for batch, hunks in zip(batches, results):
+            for comment in batch:
+                try:
+                    comment["diff_hunk"] = hunks[comment["id"]]
+                except KeyError:
+                    raise GitHubAPIError(
+                        f"No diff hunk returned for comment {comment['id']}"
+                    ) from None
+
+    def _fetch_diff_hunks(self, comments: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Fetch diff hunks by comment id in a single nodes(ids:) query."""
+        data = self._post_graphql(
+            _DIFF_HUNKS_QUERY, {"ids": [comment["id"] for comment in comments]}
+        )
+        try:
+            # A node is null when its id can no longer be resolved
+            return {
+                node["id"]: node["diffHunk"] for node in data["data"]["nodes"] if node
+            }
+        except (KeyError, TypeError):
+            raise GitHubAPIError("Malformed diff hunk response from GitHub") from None
 
-                # Handle pagination within each thread's comments
-                thread_comments = self._get_all_thread_comments(
-                    thread, owner, repo, pr_number, include_outdated
-                )
-                comments.extend(thread_comments)
+    def _post_graphql(
+        self, query: str, variables: Dict[str, Any], cacheable: bool = True
+    ) -> Dict[str, Any]:
+        """POST a GraphQL query and return the decoded response body.
 
-            if review_threads.get("pageInfo", {}).get("hasNextPage"):
-                threads_cursor = review_threads["pageInfo"]["endCursor"]
-            else:
-                break
+        When the client has a cache and the request is cacheable, a fresh
+        cached body is returned without a network round-trip, and successful
+        responses are stored for later runs.
 
-        return sorted(comments, key=lambda c: c.get("createdAt", ""))
+        Raises:
+            GitHubAPIError: On a non-200 status or GraphQL errors
+        """
+        cache_key = None
+        if cacheable and self.cache is not None:
+            cache_key = self.cache.make_key(self.token, query, variables)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-    def _get_all_thread_comments(
-        self,
-        thread: Dict[str, Any],
-        owner: str,
-        repo: str,
-        pr_number: int,
-        include_outdated: bool,
-    ) -> List[Dict[str, Any]]:
-        """Get all comments from a thread, handling pagination within the thread."""
-        comments = []
+        response = self.session.post(
+            self.graphql_url,
+            json={"query": query, "variables": variables},
+            timeout=30,
+        )
 
-        # Get comments from the initial thread data
-        thread_comments_data = thread.get("comments", {})
-        for comment in thread_comments_data.get("nodes", []):
-            if not include_outdated and self._is_outdated(comment):
-                continue
-            comments.append(self._format_graphql_comment(comment))
+        if response.status_code != 200:
+            raise GitHubAPIError(
+                f"GitHub API error: {response.status_code} - {response.text}"
+            )
 
-        # If there are more comments in this thread, paginate through them
-        comments_page_info = thread_comments_data.get("pageInfo", {})
-        if comments_page_info.get("hasNextPage"):
-            thread_id = thread.get("id")
-            if thread_id:
-                additional_comments = self._get_additional_thread_comments(
-                    thread_id, comments_page_info.get("endCursor"), include_outdated
-                )
-                comments.extend(additional_comments)
+        data = response.json()
+        if "errors" in data:
+            raise GitHubAPIError(f"GitHub GraphQL API error: {data['errors']}")
 
-        return comments
+        if cache_key is not None:
+            self.cache.set(cache_key, data)
+        return data
 
-    def _get_additional_thread_comments(
-        self, thread_id: str, comments_cursor: str, include_outdated: bool
+    def _get_threads_comments(
+        self, threads: List[Dict[str, Any]], include_outdated: bool
     ) -> List[Dict[str, Any]]:
-        """Fetch additional comments for a specific thread using pagination."""
-        comments = []
-
-        while comments_cursor:
-            query = """
-            query($threadId: ID!, $commentsCursor: String) {
-              node(id: $threadId) {
-                ... on PullRequestReviewThread {
-                  comments(first: 100, after: $commentsCursor) {
-                    pageInfo {
-                      endCursor
-                      hasNextPage
-                    }
-                    nodes {
-                      id
-                      author {
-                        login
-                      }
-                      body
-                      createdAt
-                      updatedAt
-                      path
-                      diffHunk
-                      position
-                      url
-                      line
-                    }
-                  }
-                }
-              }
-            }
-            """
+        """Get all comments for a page of threads, in thread order.
 
-            variables = {
-                "threadId": thread_id,
-                "commentsCursor": comments_cursor,
-            }
+        Threads with more comments than fit in the first page are continued
+        together via batched queries rather than one request per thread.
+        """
+        thread_comments = []
+        pending: List[Tuple[str, str]] = []
 
-            response = self.session.post(
-                self.graphql_url,
-                json={"query": query, "variables": variables},
-                timeout=30,
+        for thread in threads:
+            thread_comments_data = thread["comments"]
+            thread_comments.append(
+                self._filter_comments(thread_comments_data["nodes"], include_outdated)
             )
 
-            if response.status_code != 200:
-                raise GitHubAPIError(
-                    f"GitHub API error: {response.status_code} - {response.text}"
-                )
+            # Collect threads that need further pages of comments
+            comments_page_info = thread_comments_data.get("pageInfo", {})
+            thread_id = thread.get("id")
+            cursor = comments_page_info.get("endCursor")
+            if comments_page_info.get("hasNextPage") and thread_id and cursor:
+                pending.append((thread_id, cursor))
 
-            data = response.json()
-            if "errors" in data:
-                raise GitHubAPIError(f"GitHub GraphQL API error: {data['errors']}")
+        if pending:
+            additional = self._get_additional_comments(pending, include_outdated)
+            for thread, comments in zip(threads, thread_comments):
+                comments.extend(additional.get(thread.get("id"), []))
 
-            thread_data = data.get("data", {}).get("node", {})
-            thread_comments_data = thread_data.get("comments", {})
+        return [comment for comments in thread_comments for comment in comments]
 
-            for comment in thread_comments_data.get("nodes", []):
-                if not include_outdated and self._is_outdated(comment):
-                    continue
-                comments.append(self._format_graphql_comment(comment))
+    def _get_additional_comments(
+        self, pending: List[Tuple[str, str]], include_outdated: bool
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch remaining comment pages for several threads.
 
-            # Check if there are more pages
-            comments_page_info = thread_comments_data.get("pageInfo", {})
-            if comments_page_info.get("hasNextPage"):
-                comments_cursor = comments_page_info.get("endCursor")
-            else:
-                break
+        Threads are grouped into aliased queries of THREADS_PER_REQUEST; when
+        there is more than one group, groups are fetched concurrently on a
+        bounded thread pool.
+
+        Args:
+            pending: (thread_id, comments_cursor) pairs
+            include_outdated: Whether to keep outdated comments
+
+        Returns:
+            Mapping of thread ID to its additional comments
+        """
+        batches = [
+            pending[i : i + THREADS_PER_REQUEST]
+            for i in range(0, len(pending), THREADS_PER_REQUEST)
+        ]
+
+        def fetch_batch(
+            batch: List[Tuple[str, str]],
+        ) -> Dict[str, List[Dict[str, Any]]]:
+            return self._get_additional_comments_batch(batch, include_outdated)
+
+        if len(batches) > 1:
+            workers = min(MAX_CONCURRENT_REQUESTS, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(fetch_batch, batches))
+        else:
+            results = [fetch_batch(batches[0])]
+
+        merged: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            merged.update(result)
+        return merged
+
+    def _get_additional_comments_batch(
+        self, batch: List[Tuple[str, str]], include_outdated: bool
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Paginate comments for a group of threads, one aliased query per round.
+
+        Each round requests the next page for every thread in the group that
+        still has one, so N threads cost one request per page depth instead
+        of N.
+        """
+        comments: Dict[str, List[Dict[str, Any]]] = {
+            thread_id: [] for thread_id, _ in batch
+        }
+
+        while batch:
+            query = self._build_thread_comments_query(len(batch))
+            variables: Dict[str, Any] = {}
+            for i, (thread_id, comments_cursor) in enumerate(batch):
+                variables[f"thread{i}"] = thread_id
+                variables[f"cursor{i}"] = comments_cursor
+
+            data = self._post_graphql(query, variables)
+
+            next_batch = []
+            try:
+                for i, (thread_id, _) in enumerate(batch):
+                    # A thread deleted since its first page comes back null
+                    thread_data = data["data"][f"thread{i}"]
+                    if thread_data is None:
+                        continue
+                    thread_comments_data = thread_data["comments"]
+                    comments[thread_id].extend(
+                        self._filter_comments(
+                            thread_comments_data["nodes"], include_outdated
+                        )
+                    )
+
+                    # Check if there are more pages
+                    comments_page_info = thread_comments_data["pageInfo"]
+                    cursor = comments_page_info["endCursor"]
+                    if comments_page_info["hasNextPage"] and cursor:
+                        next_batch.append((thread_id, cursor))
+            except (KeyError, TypeError):
+                raise GitHubAPIError(
+                    "Malformed review comments response from GitHub"
+                ) from None
+
+            batch = next_batch
 
         return comments
 
-    def _is_outdated(self, comment: Dict[str, Any]) -> bool:
-        """Determines if a comment is outdated."""
-        # In the GraphQL response, outdated comments have a null position.
-        return comment.get("position") is None
+    def _build_thread_comments_query(self, count: int) -> str:
+        """Builds an aliased query continuing comment pagination for threads.
+
+        Thread ``i`` is selected as ``thread{i}`` using the ``$thread{i}`` and
+        ``$cursor{i}`` variables.
+        """
+        params = ", ".join(f"$thread{i}: ID!, $cursor{i}: String" for i in range(count))
+        selections = "".join(
+            f"""
+          thread{i}: node(id: $thread{i}) {{
+            ... on PullRequestReviewThread {{
+              comments(first: 100, after: $cursor{i}) {{
+                pageInfo {{
+                  endCursor
+                  hasNextPage
+                }}
+                nodes {{{_COMMENT_FIELDS}  diffHunk
+                }}
+              }}
+            }}
+          }}"""
+            for i in range(count)
+        )
+        return _minify_query(f"query({params}) {{{selections}\n}}")
+
+    def _filter_comments(
+        self, nodes: List[Dict[str, Any]], include_outdated: bool
+    ) -> List[Dict[str, Any]]:
+        """Format comment nodes, dropping outdated ones unless requested."""
+        formatted = []
+        for comment in nodes:
+            # In the GraphQL response, outdated comments have a null position.
+            outdated = comment.get("position") is None
+            if outdated and not include_outdated:
+                continue
+            formatted.append(self._format_graphql_comment(comment, outdated))
+        return formatted
 
-    def _format_graphql_comment(self, comment: Dict[str, Any]) -> Dict[str, Any]:
+    def _format_graphql_comment(
+        self, comment: Dict[str, Any], outdated: bool
+    ) -> Dict[str, Any]:
         """Formats a GraphQL comment object to match the structure of the REST API response."""
-        return {
-            "id": comment.get("id"),
-            "user": {"login": comment.get("author", {}).get("login")},
-            "body": comment.get("body"),
-            "created_at": comment.get("createdAt"),
-            "updated_at": comment.get("updatedAt"),
-            "path": comment.get("path"),
-            "diff_hunk": comment.get("diffHunk"),
-            "line": comment.get("line"),
-            "position": comment.get("position"),
-            "html_url": comment.get("url"),
-            # The 'side' isn't directly available in the same way,
-            # but we can use the outdated status to infer it.
-            "side": "LEFT" if self._is_outdated(comment) else "RIGHT",
-        }
+        formatted = {dst: comment.get(src) for dst, src in _KEY_MAP}
+        # Deleted accounts come back with a null author
+        formatted["user"] = {"login": (comment.get("author") or {}).get("login")}
+        # The 'side' isn't directly available in the same way,
+        # but we can use the outdated status to infer it.
+        formatted["side"] = "LEFT" if outdated else "RIGHT"
+        return formatted
 
     def _build_graphql_query(
-        self, owner: str, repo: str, pr_number: int, threads_cursor: Optional[str]
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        threads_cursor: Optional[str],
+        with_hunks: bool = True,
     ):
         """Builds the GraphQL query and variables for fetching review threads."""
-        query = """
-        query($owner: String!, $repo: String!, $prNumber: Int!, $threadsCursor: String) {
-          repository(owner: $owner, name: $repo) {
-            pullRequest(number: $prNumber) {
-              reviewThreads(first: 100, after: $threadsCursor) {
-                pageInfo {
-                  endCursor
-                  hasNextPage
-                }
-                nodes {
-                  id
-                  isResolved
-                  comments(first: 100) {
-                    pageInfo {
-                      endCursor
-                      hasNextPage
-                    }
-                    nodes {
-                      id
-                      author {
-                        login
-                      }
-                      body
-                      createdAt
-                      updatedAt
-                      path
-                      diffHunk
-                      position
-                      url
-                      line
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
         variables = {
             "owner": owner,
             "repo": repo,
             "prNumber": pr_number,
             "threadsCursor": threads_cursor,
+            "withHunks": with_hunks,
         }
-        return query, variables
+        return _REVIEW_THREADS_QUERY, variables
 
     def find_pr_by_branch(
         self, owner: str, repo: str, branch_name: str
     ) -> Optional[int]:
         """Find the PR number for a given branch name."""
-        query = """
-        query($owner: String!, $repo: String!, $branchName: String!) {
-          repository(owner: $owner, name: $repo) {
-            pullRequests(first: 10, states: [OPEN], headRefName: $branchName) {
-              nodes {
-                number
-                headRefName
-                state
-              }
-            }
-          }
-        }
-        """
         variables = {
             "owner": owner,
             "repo": repo,
             "branchName": branch_name,
         }
 
-        response = self.session.post(
-            self.graphql_url, json={"query": query, "variables": variables}, timeout=30
-        )
+        # Not cached: a PR opened for the branch should be found right away
+        data = self._post_graphql(_FIND_PR_QUERY, variables, cacheable=False)
 
-        if response.status_code != 200:
-            raise GitHubAPIError(
-                f"GitHub API error: {response.status_code} - {response.text}"
-            )
+        try:
+            prs = data["data"]["repository"]["pullRequests"]["nodes"]
+        except (KeyError, TypeError):
+            prs = []
 
-        data = response.json()
-        if "errors" in data:
-            raise GitHubAPIError(f"GitHub GraphQL API error: {data['errors']}")
+        # Return the first open PR for this branch
+        for pr in prs:
+            if pr.get("state") == "OPEN" and pr.get("headRefName") == branch_name:
+                return pr.get("number")
 
-        prs = (
-            data.get("data", {})
-            .get("repository", {})
-            .get("pullRequests", {})
-            .get("nodes", [])
+        return None
+
+    def get_pr_by_branch_with_threads(
+        self, owner: str, repo: str, branch_name: str, include_resolved: bool = False
+    ) -> Optional[int]:
+        """Find the PR number for a branch, prefetching its review threads.
+
+        The PR lookup and the first page of review threads share one request.
+        The page is kept so that a following get_pr_review_comments call for
+        the same PR starts from it instead of requesting it again; pass the
+        include_resolved value that call will use so the page is requested
+        the same way.
+        """
+        with_hunks = include_resolved
+        variables = {
+            "owner": owner,
+            "repo": repo,
+            "branchName": branch_name,
+            "threadsCursor": None,
+            "withHunks": with_hunks,
+        }
+
+        # Not cached: a PR opened for the branch should be found right away
+        data = self._post_graphql(
+            _FIND_PR_WITH_THREADS_QUERY, variables, cacheable=False
         )
 
-        # Return the first open PR for this branch
+        try:
+            prs = data["data"]["repository"]["pullRequests"]["nodes"]
+        except (KeyError, TypeError):
+            prs = []
+
         for pr in prs:
             if pr.get("state") == "OPEN" and pr.get("headRefName") == branch_name:
-                return pr.get("number")
+                pr_number = pr.get("number")
+                if "reviewThreads" in pr:
+                    self._prefetched_threads[(owner, repo, pr_number)] = (
+                        with_hunks,
+                        pr["reviewThreads"],
+                    )
+                return pr_number
 
         return None
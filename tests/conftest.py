@@ -1,9 +1,12 @@
 """Pytest configuration and shared fixtures."""
 
+import copy
 import pytest
 import tempfile
 from pathlib import Path
 
+from gh_pr_rev_md.github_client import GitHubClient, _new_session
+
 
 @pytest.fixture
 def temp_dir():
@@ -12,6 +15,35 @@ def temp_dir():
         yield Path(tmp_dir)
 
 
+@pytest.fixture(scope="session")
+def shared_session():
+    """One configured requests session reused by every test client."""
+    session = _new_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def _shared_github_client(shared_session):
+    client = GitHubClient("test_token")
+    client.session.close()
+    shared_session.headers.update(client.session.headers)
+    client.session = shared_session
+    return client
+
+
+@pytest.fixture
+def github_client(_shared_github_client):
+    """A GitHubClient for testing, copied from one built for the session.
+
+    The shallow copy shares the configured session but gets its own
+    prefetched thread pages, so nothing a test sets on it leaks into the next.
+    """
+    client = copy.copy(_shared_github_client)
+    client._prefetched_threads = {}
+    return client
+
+
 @pytest.fixture
 def sample_pr_comments():
     """Sample PR review comments data for testing."""
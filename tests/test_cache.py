@@ -0,0 +1,93 @@
+"""Tests for the on-disk GraphQL response cache."""
+
+import os
+import sqlite3
+import stat
+from pathlib import Path
+
+import pytest
+
+from gh_pr_rev_md import cache as cache_module
+from gh_pr_rev_md.cache import ResponseCache
+
+pytestmark = pytest.mark.unit
+
+
+def test_set_then_get_round_trips(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "gh-pr-rev-md" / "responses.sqlite3")
+    cache.set("k", {"data": {"value": 1}})
+    assert cache.get("k") == {"data": {"value": 1}}
+
+
+def test_get_missing_key(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    assert cache.get("missing") is None
+
+
+def test_expired_entry_is_a_miss(tmp_path: Path, monkeypatch) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite3", ttl=10)
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1000.0)
+    cache.set("k", {"data": {}})
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1011.0)
+    assert cache.get("k") is None
+
+
+def test_set_prunes_expired_entries(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "responses.sqlite3"
+    cache = ResponseCache(path, ttl=10)
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1000.0)
+    cache.set("old1", {"data": {}})
+    cache.set("old2", {"data": {}})
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1011.0)
+    cache.set("new", {"data": {}})
+
+    with sqlite3.connect(path) as conn:
+        keys = [row[0] for row in conn.execute("SELECT key FROM responses")]
+    assert keys == ["new"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+def test_cache_is_private_to_owner(tmp_path: Path) -> None:
+    path = tmp_path / "gh-pr-rev-md" / "responses.sqlite3"
+    ResponseCache(path).set("k", {"data": {}})
+    assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_setup_runs_once(tmp_path: Path, monkeypatch) -> None:
+    cache = ResponseCache(tmp_path / "gh-pr-rev-md" / "responses.sqlite3")
+    real_open = cache_module.os.open
+    opened = []
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(cache_module.os, "open", counting_open)
+    cache.set("a", {"data": {}})
+    cache.get("a")
+    cache.set("b", {"data": {}})
+    assert cache.get("b") == {"data": {}}
+    assert opened == [cache.path]
+
+
+def test_unusable_path_is_a_miss(tmp_path: Path) -> None:
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("", encoding="utf-8")
+    cache = ResponseCache(blocker / "responses.sqlite3")
+    cache.set("k", {"data": {}})
+    assert cache.get("k") is None
+
+
+def test_make_key_depends_on_token_and_variables() -> None:
+    base = ResponseCache.make_key("t1", "query", {"a": 1})
+    assert base == ResponseCache.make_key("t1", "query", {"a": 1})
+    assert base != ResponseCache.make_key("t2", "query", {"a": 1})
+    assert base != ResponseCache.make_key("t1", "query", {"a": 2})
+
+
+def test_default_cache_path_uses_xdg(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_module.default_cache_path() == (
+        tmp_path / "gh-pr-rev-md" / "responses.sqlite3"
+    )
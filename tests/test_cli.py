@@ -1,76 +1,142 @@
 """Comprehensive tests for CLI functionality, focusing on file output features."""
 
 import pytest
+import re
+import requests
 import subprocess
+import time
+from click import BadParameter
 from click.testing import CliRunner
+from types import SimpleNamespace
 from unittest import mock
 from pathlib import Path
-from datetime import datetime
 import yaml
 
 from gh_pr_rev_md import cli
 from gh_pr_rev_md import github_client
 from gh_pr_rev_md import config as config_module
 
+pytestmark = pytest.mark.cli
+
 
 # --- Fixtures ---
 
 
-@pytest.fixture
+# Comments returned by the mocked client; built once for the whole module
+_CANNED_COMMENTS = (
+    {
+        "id": 1,
+        "user": {"login": "testuser"},
+        "body": "Test comment 1",
+        "created_at": "2023-01-01T10:00:00Z",
+        "updated_at": "2023-01-01T10:00:00Z",
+        "path": "file1.py",
+        "diff_hunk": "@@ -1,3 +1,3 @@",
+        "line": 10,
+    },
+    {
+        "id": 2,
+        "user": {"login": "anotheruser"},
+        "body": "Test comment 2",
+        "created_at": "2023-01-01T11:00:00Z",
+        "updated_at": "2023-01-01T11:00:00Z",
+        "path": "file2.js",
+        "diff_hunk": "@@ -5,2 +5,3 @@",
+        "line": 20,
+    },
+)
+
+
+@pytest.fixture(scope="session")
 def runner():
-    """Fixture for Click's CliRunner to invoke CLI commands."""
+    """Fixture for Click's CliRunner to invoke CLI commands.
+
+    CliRunner keeps no state between invoke() calls, so one is shared.
+    """
     return CliRunner()
 
 
+def _patch_github_client(monkeypatch):
+    mock_instance = mock.Mock(spec_set=github_client.GitHubClient)
+    mock_instance.get_pr_review_comments.return_value = list(_CANNED_COMMENTS)
+    monkeypatch.setattr(cli, "GitHubClient", lambda *args, **kwargs: mock_instance)
+    return mock_instance
+
+
+def _patch_formatter(monkeypatch):
+    mock_formatter_func = mock.Mock(
+        return_value="# PR #123 Review Comments\n\nMocked markdown output"
+    )
+    monkeypatch.setattr(cli, "format_comments_as_markdown", mock_formatter_func)
+    return mock_formatter_func
+
+
+def _patch_localtime(monkeypatch):
+    fixed_time = time.struct_time((2023, 1, 15, 12, 30, 45, 6, 15, 0))
+    # A plain function is enough: no test inspects the calls
+    monkeypatch.setattr(cli.time, "localtime", lambda *args: fixed_time)
+    return fixed_time
+
+
 @pytest.fixture
-def mock_github_client():
+def mock_github_client(monkeypatch):
     """Mocks the GitHubClient to control API responses."""
-    with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client_cls:
-        mock_instance = mock_client_cls.return_value
-        mock_instance.get_pr_review_comments.return_value = [
-            {
-                "id": 1,
-                "user": {"login": "testuser"},
-                "body": "Test comment 1",
-                "created_at": "2023-01-01T10:00:00Z",
-                "updated_at": "2023-01-01T10:00:00Z",
-                "path": "file1.py",
-                "diff_hunk": "@@ -1,3 +1,3 @@",
-                "line": 10,
-            },
-            {
-                "id": 2,
-                "user": {"login": "anotheruser"},
-                "body": "Test comment 2",
-                "created_at": "2023-01-01T11:00:00Z",
-                "updated_at": "2023-01-01T11:00:00Z",
-                "path": "file2.js",
-                "diff_hunk": "@@ -5,2 +5,3 @@",
-                "line": 20,
-            },
-        ]
-        yield mock_instance
+    return _patch_github_client(monkeypatch)
 
 
 @pytest.fixture
-def mock_formatter():
+def mock_formatter(monkeypatch):
     """Mocks the format_comments_as_markdown function."""
-    with mock.patch(
-        "gh_pr_rev_md.cli.format_comments_as_markdown"
-    ) as mock_formatter_func:
-        mock_formatter_func.return_value = (
-            "# PR #123 Review Comments\n\nMocked markdown output"
-        )
-        yield mock_formatter_func
+    return _patch_formatter(monkeypatch)
+
+
+@pytest.fixture
+def mock_time_now(monkeypatch):
+    """Mocks time.localtime() for deterministic timestamp generation."""
+    return _patch_localtime(monkeypatch)
+
+
+@pytest.fixture
+def cli_mocks(monkeypatch):
+    """Installs the client, formatter and clock mocks in one fixture."""
+    return SimpleNamespace(
+        client=_patch_github_client(monkeypatch),
+        formatter=_patch_formatter(monkeypatch),
+        localtime=_patch_localtime(monkeypatch),
+    )
+
+
+@pytest.fixture
+def written_files(monkeypatch):
+    """Capture Path.write_bytes calls in memory instead of touching the disk."""
+    written = {}
+
+    def fake_write_bytes(self, data):
+        written[str(self)] = data
+        return len(data)
+
+    monkeypatch.setattr(cli.Path, "write_bytes", fake_write_bytes)
+    return written
+
+
+@pytest.fixture(scope="session")
+def _config_dir(tmp_path_factory):
+    """App config directory shared by every config test in the session."""
+    app_dir = tmp_path_factory.mktemp("cfg") / "gh-pr-rev-md"
+    app_dir.mkdir()
+    return app_dir
 
 
 @pytest.fixture
-def mock_datetime_now():
-    """Mocks datetime.now() for deterministic timestamp generation."""
-    with mock.patch("gh_pr_rev_md.cli.datetime") as mock_dt:
-        fixed_time = datetime(2023, 1, 15, 12, 30, 45)
-        mock_dt.now.return_value = fixed_time
-        yield mock_dt
+def mock_config_file(_config_dir, monkeypatch):
+    """Points XDG_CONFIG_HOME at the shared directory; returns config.yaml.
+
+    Any file left by a previous test is removed, so tests start with no config.
+    """
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(_config_dir.parent))
+    config_file = _config_dir / "config.yaml"
+    config_file.unlink(missing_ok=True)
+    return config_file
 
 
 # --- Tests for parse_pr_url function ---
@@ -113,21 +179,29 @@ def test_parse_pr_url_valid():
 )
 def test_parse_pr_url_invalid(invalid_url):
     """Test that parse_pr_url raises click.BadParameter for invalid URLs."""
-    with pytest.raises(cli.click.BadParameter):
+    with pytest.raises(BadParameter):
         cli.parse_pr_url(invalid_url)
 
 
+def test_parse_pr_url_uses_cached_pattern():
+    """The PR URL pattern is compiled once at import, not on every call."""
+    assert isinstance(cli._PR_URL_RE, re.Pattern)
+    with mock.patch.object(cli.re, "compile") as mock_compile:
+        cli.parse_pr_url("https://github.com/owner/repo/pull/1")
+    mock_compile.assert_not_called()
+
+
 # --- Tests for generate_filename function ---
 
 
-def test_generate_filename_format(mock_datetime_now):
+def test_generate_filename_format(mock_time_now):
     """Test that generate_filename produces the expected format."""
     filename = cli.generate_filename("owner", "repo", 123)
     expected = "owner-repo-20230115-123045-pr123.md"
     assert filename == expected
 
 
-def test_generate_filename_edge_cases(mock_datetime_now):
+def test_generate_filename_edge_cases(mock_time_now):
     """Test generate_filename with edge case inputs."""
     test_cases = [
         ("", "repo", 123, "-repo-20230115-123045-pr123.md"),
@@ -153,60 +227,55 @@ def test_generate_filename_edge_cases(mock_datetime_now):
 )
 def test_main_output_creates_expected_file(
     runner,
-    mock_github_client,
-    mock_formatter,
-    mock_datetime_now,
+    cli_mocks,
+    written_files,
     extra_args,
     expected_filename,
 ):
     """Test that output flags create files with correct names and content."""
-    with runner.isolated_filesystem():
-        result = runner.invoke(
-            cli.main,
-            [
-                "https://github.com/owner/repo/pull/123",
-                "--token",
-                "test_token",
-                *extra_args,
-            ],
-        )
+    result = runner.invoke(
+        cli.main,
+        [
+            "https://github.com/owner/repo/pull/123",
+            "--token",
+            "test_token",
+            *extra_args,
+        ],
+    )
 
-        assert result.exit_code == 0
-        assert Path(expected_filename).exists()
+    assert result.exit_code == 0
+    assert list(written_files) == [expected_filename]
 
-        content = Path(expected_filename).read_text(encoding="utf-8")
-        assert content == "# PR #123 Review Comments\n\nMocked markdown output"
+    content = written_files[expected_filename].decode("utf-8")
+    assert content == "# PR #123 Review Comments\n\nMocked markdown output"
 
-        assert "Output saved to:" in result.output
-        assert expected_filename in result.output
+    assert "Output saved to:" in result.output
+    assert expected_filename in result.output
 
 
-def test_main_output_file_precedence(
-    runner, mock_github_client, mock_formatter, mock_datetime_now
-):
+def test_main_output_file_precedence(runner, cli_mocks, written_files):
     """Test that --output-file takes precedence over --output when both are provided."""
-    with runner.isolated_filesystem():
-        custom_filename = "explicit_file.md"
-        auto_filename = "owner-repo-20230115-123045-pr123.md"
+    custom_filename = "explicit_file.md"
+    auto_filename = "owner-repo-20230115-123045-pr123.md"
 
-        result = runner.invoke(
-            cli.main,
-            [
-                "https://github.com/owner/repo/pull/123",
-                "--token",
-                "test_token",
-                "--output",
-                "--output-file",
-                custom_filename,
-            ],
-        )
+    result = runner.invoke(
+        cli.main,
+        [
+            "https://github.com/owner/repo/pull/123",
+            "--token",
+            "test_token",
+            "--output",
+            "--output-file",
+            custom_filename,
+        ],
+    )
 
-        assert result.exit_code == 0
-        assert Path(custom_filename).exists()
-        assert not Path(auto_filename).exists()  # Auto-generated file should NOT exist
+    assert result.exit_code == 0
+    # Only the explicit file is written, not the auto-generated one
+    assert list(written_files) == [custom_filename]
 
-        assert custom_filename in result.output
-        assert auto_filename not in result.output
+    assert custom_filename in result.output
+    assert auto_filename not in result.output
 
 
 def test_main_no_output_flags_stdout(runner, mock_github_client, mock_formatter):
@@ -392,12 +461,14 @@ def test_main_github_api_error(runner, mock_github_client):
     )
 
     assert result.exit_code == 1
-    assert "Error fetching data from GitHub: PR not found" in result.output
+    assert result.output.startswith("Error fetching data from GitHub: PR not found")
 
 
 def test_main_github_api_generic_error(runner, mock_github_client):
-    """Test CLI handles unexpected exceptions during API calls."""
-    mock_github_client.get_pr_review_comments.side_effect = Exception("Network timeout")
+    """Test CLI handles network exceptions during API calls."""
+    mock_github_client.get_pr_review_comments.side_effect = requests.Timeout(
+        "Network timeout"
+    )
 
     result = runner.invoke(
         cli.main, ["https://github.com/owner/repo/pull/123", "--token", "test_token"]
@@ -407,6 +478,38 @@ def test_main_github_api_generic_error(runner, mock_github_client):
     assert "An unexpected error occurred: Network timeout" in result.output
 
 
+def test_main_unexpected_error_propagates(runner, mock_github_client):
+    """Test CLI does not swallow exceptions that indicate a bug."""
+    mock_github_client.get_pr_review_comments.side_effect = RuntimeError("bug")
+
+    result = runner.invoke(
+        cli.main, ["https://github.com/owner/repo/pull/123", "--token", "test_token"]
+    )
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, RuntimeError)
+    assert "An unexpected error occurred" not in result.output
+
+
+@pytest.mark.parametrize(
+    "extra_args,expect_cache", [([], True), (["--no-cache"], False)]
+)
+def test_main_no_cache_flag(runner, extra_args, expect_cache):
+    """--no-cache constructs the client without a response cache."""
+    with mock.patch.object(cli, "GitHubClient") as mock_client_cls:
+        mock_client_cls.return_value.get_pr_review_comments.return_value = []
+        result = runner.invoke(
+            cli.main,
+            ["https://github.com/owner/repo/pull/123", "--token", "t", *extra_args],
+            standalone_mode=False,
+            catch_exceptions=False,
+        )
+
+    assert result.exit_code == 0
+    cache = mock_client_cls.call_args.kwargs["cache"]
+    assert (cache is not None) is expect_cache
+
+
 def test_main_absolute_path_reporting(runner, mock_github_client, mock_formatter):
     """Test that success message shows absolute path of created file."""
     with runner.isolated_filesystem():
@@ -427,13 +530,10 @@ def test_main_absolute_path_reporting(runner, mock_github_client, mock_formatter
 
 
 def test_config_applies_when_cli_missing(
-    runner, mock_github_client, mock_formatter, tmp_path, monkeypatch
+    runner, mock_github_client, mock_formatter, mock_config_file, monkeypatch
 ):
     """If CLI flags are not provided, values from XDG YAML config are used."""
-    xdg_home = tmp_path / ".config"
-    app_dir = xdg_home / "gh-pr-rev-md"
-    app_dir.mkdir(parents=True)
-    (app_dir / "config.yaml").write_text(
+    mock_config_file.write_text(
         """
 output_file: config_output.md
 include_outdated: true
@@ -441,7 +541,6 @@ include_outdated: true
         encoding="utf-8",
     )
 
-    monkeypatch.setenv("XDG_CONFIG_HOME", str(xdg_home))
     monkeypatch.delenv("GITHUB_TOKEN", raising=False)
 
     with runner.isolated_filesystem():
@@ -462,21 +561,16 @@ include_outdated: true
 
 
 def test_cli_overrides_config(
-    runner, mock_github_client, mock_formatter, tmp_path, monkeypatch
+    runner, mock_github_client, mock_formatter, mock_config_file, monkeypatch
 ):
     """CLI options should override configuration file values."""
-    xdg_home = tmp_path / ".config"
-    app_dir = xdg_home / "gh-pr-rev-md"
-    app_dir.mkdir(parents=True)
-    (app_dir / "config.yaml").write_text(
+    mock_config_file.write_text(
         """
 output_file: from_config.md
 """,
         encoding="utf-8",
     )
 
-    monkeypatch.setenv("XDG_CONFIG_HOME", str(xdg_home))
-
     with runner.isolated_filesystem():
         result = runner.invoke(
             cli.main,
@@ -495,47 +589,34 @@ output_file: from_config.md
         assert not Path("from_config.md").exists()
 
 
-def test_config_print_redacts_token(runner, tmp_path, monkeypatch):
+def test_config_print_redacts_token(runner, mock_config_file):
     """--config-print shows config with token redacted."""
-    xdg_home = tmp_path / ".config"
-    app_dir = xdg_home / "gh-pr-rev-md"
-    app_dir.mkdir(parents=True)
-    (app_dir / "config.yaml").write_text(
+    mock_config_file.write_text(
         yaml.safe_dump({"token": "abc123def456", "include_resolved": True}),
         encoding="utf-8",
     )
 
-    monkeypatch.setenv("XDG_CONFIG_HOME", str(xdg_home))
-
     result = runner.invoke(cli.main, ["--config-print"])
     assert result.exit_code == 0
     assert "token: abc******456" in result.output
     assert "include_resolved: true" in result.output
 
 
-def test_config_print_no_config(runner, tmp_path, monkeypatch):
+def test_config_print_no_config(runner, mock_config_file):
     """--config-print handles missing configuration."""
-    xdg_home = tmp_path / ".config"
-    monkeypatch.setenv("XDG_CONFIG_HOME", str(xdg_home))
-
     result = runner.invoke(cli.main, ["--config-print"])
     assert result.exit_code == 0
     assert "No configuration found." in result.output
 
 
 @pytest.mark.parametrize("short_token", ["123456", "abc"])  # 6 or fewer chars
-def test_config_print_redacts_short_token(runner, tmp_path, monkeypatch, short_token):
+def test_config_print_redacts_short_token(runner, mock_config_file, short_token):
     """--config-print redacts short tokens completely."""
-    xdg_home = tmp_path / ".config"
-    app_dir = xdg_home / "gh-pr-rev-md"
-    app_dir.mkdir(parents=True)
-    (app_dir / "config.yaml").write_text(
+    mock_config_file.write_text(
         yaml.safe_dump({"token": short_token}),
         encoding="utf-8",
     )
 
-    monkeypatch.setenv("XDG_CONFIG_HOME", str(xdg_home))
-
     result = runner.invoke(cli.main, ["--config-print"])
     assert result.exit_code == 0
     assert "token: ******" in result.output
@@ -556,8 +637,8 @@ def test_get_current_branch_pr_url_native_success():
             "feature-branch",
         )
 
-        with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client:
-            mock_instance = mock.MagicMock()
+        with mock.patch.object(cli, "GitHubClient") as mock_client:
+            mock_instance = mock.Mock()
             mock_instance.find_pr_by_branch.return_value = 123
             mock_client.return_value = mock_instance
 
@@ -565,6 +646,31 @@ def test_get_current_branch_pr_url_native_success():
             assert result == "https://github.com/owner/repo/pull/123"
 
 
+def test_get_current_branch_pr_url_native_given_client_prefetches():
+    """A supplied client resolves the PR and prefetches its first thread page."""
+    with mock.patch("gh_pr_rev_md.cli.GitRepository") as mock_repo_class:
+        mock_repo = mock_repo_class.return_value
+        mock_repo.get_repository_info.return_value = (
+            "github.com",
+            "owner",
+            "repo",
+            "feature-branch",
+        )
+        client = mock.Mock(spec_set=github_client.GitHubClient)
+        client.get_pr_by_branch_with_threads.return_value = 123
+
+        with mock.patch.object(cli, "GitHubClient") as mock_client_cls:
+            result = cli.get_current_branch_pr_url_native("fake-token", client, True)
+
+        assert result == "https://github.com/owner/repo/pull/123"
+        # The prefetched page must be requested the way the comments will be
+        client.get_pr_by_branch_with_threads.assert_called_once_with(
+            "owner", "repo", "feature-branch", True
+        )
+        client.find_pr_by_branch.assert_not_called()
+        mock_client_cls.assert_not_called()
+
+
 def test_get_current_branch_pr_url_native_github_enterprise():
     """Test native git parsing with GitHub Enterprise."""
     with mock.patch("gh_pr_rev_md.cli.GitRepository") as mock_repo_class:
@@ -576,8 +682,8 @@ def test_get_current_branch_pr_url_native_github_enterprise():
             "main",
         )
 
-        with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client:
-            mock_instance = mock.MagicMock()
+        with mock.patch.object(cli, "GitHubClient") as mock_client:
+            mock_instance = mock.Mock()
             mock_instance.find_pr_by_branch.return_value = 456
             mock_client.return_value = mock_instance
 
@@ -639,19 +745,27 @@ def test_cli_with_period_argument_success(runner, mock_github_client, mock_forma
     with mock.patch("gh_pr_rev_md.cli.get_current_branch_pr_url") as mock_get_pr_url:
         mock_get_pr_url.return_value = "https://github.com/owner/repo/pull/456"
 
-        result = runner.invoke(cli.main, ["."])
+        result = runner.invoke(
+            cli.main,
+            [".", "--include-resolved"],
+            standalone_mode=False,
+            catch_exceptions=False,
+        )
 
         assert result.exit_code == 0
         mock_get_pr_url.assert_called_once()
+        # The branch lookup shares the client that fetches the comments, and
+        # knows whether that fetch includes resolved threads
+        assert mock_get_pr_url.call_args.args[1:] == (mock_github_client, True)
         mock_github_client.get_pr_review_comments.assert_called_once_with(
-            "owner", "repo", 456, False, False
+            "owner", "repo", 456, False, True
         )
 
 
 def test_cli_with_period_argument_error(runner):
     """Test CLI with "." argument when git operations fail."""
     with mock.patch("gh_pr_rev_md.cli.get_current_branch_pr_url") as mock_get_pr_url:
-        mock_get_pr_url.side_effect = cli.click.BadParameter("Not in a git repository")
+        mock_get_pr_url.side_effect = BadParameter("Not in a git repository")
 
         result = runner.invoke(cli.main, ["."])
 
@@ -668,9 +782,8 @@ def test_get_current_branch_pr_url_not_git_repo():
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = FileNotFoundError("git not found")
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(BadParameter, match="Git is not installed"):
                 cli.get_current_branch_pr_url()
-            assert "Git is not installed" in str(exc_info.value)
 
 
 def test_get_current_branch_pr_url_no_git_dir():
@@ -682,9 +795,8 @@ def test_get_current_branch_pr_url_no_git_dir():
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = subprocess.CalledProcessError(128, "git rev-parse")
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(BadParameter, match="Not in a git repository"):
                 cli.get_current_branch_pr_url()
-            assert "Not in a git repository" in str(exc_info.value)
 
 
 def _mock_subprocess_calls(*calls):
@@ -712,16 +824,15 @@ def test_get_current_branch_pr_url_no_origin_remote():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(returncode=0, stdout="main"),  # git branch succeeds
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="main"),  # git branch succeeds
                 subprocess.CalledProcessError(
                     1, "git remote get-url"
                 ),  # git remote get-url fails
             )
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(BadParameter, match="No 'origin' remote found"):
                 cli.get_current_branch_pr_url()
-            assert "No 'origin' remote found" in str(exc_info.value)
 
 
 def test_get_current_branch_pr_url_invalid_remote_url():
@@ -732,16 +843,15 @@ def test_get_current_branch_pr_url_invalid_remote_url():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(returncode=0, stdout="main"),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="main"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="https://gitlab.com/owner/repo.git"
                 ),  # invalid remote
             )
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(BadParameter, match="Could not parse remote URL"):
                 cli.get_current_branch_pr_url()
-            assert "Could not parse remote URL" in str(exc_info.value)
 
 
 def test_get_current_branch_pr_url_success_with_api():
@@ -752,17 +862,15 @@ def test_get_current_branch_pr_url_success_with_api():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
-                    returncode=0, stdout="feature-branch"
-                ),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="feature-branch"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo.git"
                 ),  # remote URL
             )
 
-            with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client:
-                mock_instance = mock.MagicMock()
+            with mock.patch.object(cli, "GitHubClient") as mock_client:
+                mock_instance = mock.Mock()
                 mock_instance.find_pr_by_branch.return_value = 123
                 mock_client.return_value = mock_instance
 
@@ -778,14 +886,12 @@ def test_get_current_branch_pr_url_success_with_gh_cli():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
-                    returncode=0, stdout="feature-branch"
-                ),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="feature-branch"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo.git"
                 ),  # remote URL
-                mock.MagicMock(
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo/pull/456"
                 ),  # gh pr view succeeds
             )
@@ -802,19 +908,16 @@ def test_get_current_branch_pr_url_no_pr_found():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
-                    returncode=0, stdout="feature-branch"
-                ),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="feature-branch"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo.git"
                 ),  # remote URL
                 subprocess.CalledProcessError(1, "gh pr view"),  # gh pr view fails
             )
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(BadParameter, match="No open pull request found"):
                 cli.get_current_branch_pr_url()
-            assert "No open pull request found" in str(exc_info.value)
 
 
 def test_get_current_branch_pr_url_detached_head():
@@ -825,15 +928,16 @@ def test_get_current_branch_pr_url_detached_head():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = [
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(
                     returncode=0, stdout=""
                 ),  # git branch returns empty (detached HEAD)
             ]
 
-            with pytest.raises(cli.click.BadParameter) as exc_info:
+            with pytest.raises(
+                BadParameter, match="Could not determine current branch"
+            ):
                 cli.get_current_branch_pr_url()
-            assert "Could not determine current branch" in str(exc_info.value)
 
 
 def test_get_current_branch_pr_url_ssh_remote():
@@ -844,17 +948,15 @@ def test_get_current_branch_pr_url_ssh_remote():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
-                    returncode=0, stdout="feature-branch"
-                ),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="feature-branch"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="git@github.com:owner/repo.git"
                 ),  # SSH remote URL
             )
 
-            with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client:
-                mock_instance = mock.MagicMock()
+            with mock.patch.object(cli, "GitHubClient") as mock_client:
+                mock_instance = mock.Mock()
                 mock_instance.find_pr_by_branch.return_value = 789
                 mock_client.return_value = mock_instance
 
@@ -870,20 +972,18 @@ def test_get_current_branch_pr_url_api_fallback_to_gh_cli():
 
         with mock.patch("subprocess.run") as mock_run:
             mock_run.side_effect = _mock_subprocess_calls(
-                mock.MagicMock(returncode=0),  # git rev-parse succeeds
-                mock.MagicMock(
-                    returncode=0, stdout="feature-branch"
-                ),  # git branch succeeds
-                mock.MagicMock(
+                mock.Mock(returncode=0),  # git rev-parse succeeds
+                mock.Mock(returncode=0, stdout="feature-branch"),  # git branch succeeds
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo.git"
                 ),  # remote URL
-                mock.MagicMock(
+                mock.Mock(
                     returncode=0, stdout="https://github.com/owner/repo/pull/999"
                 ),  # gh pr view succeeds
             )
 
-            with mock.patch("gh_pr_rev_md.cli.GitHubClient") as mock_client:
-                mock_instance = mock.MagicMock()
+            with mock.patch.object(cli, "GitHubClient") as mock_client:
+                mock_instance = mock.Mock()
                 mock_instance.find_pr_by_branch.side_effect = (
                     github_client.GitHubAPIError("API failed")
                 )
@@ -905,7 +1005,7 @@ def test_get_current_branch_pr_url_subprocess_branch_error(monkeypatch):
 
     monkeypatch.setattr(cli.subprocess, "run", run_side_effect)
 
-    with pytest.raises(cli.click.BadParameter, match="Failed to get current branch"):
+    with pytest.raises(BadParameter, match="Failed to get current branch"):
         cli.get_current_branch_pr_url_subprocess()
 
 
@@ -932,14 +1032,14 @@ def test_get_current_branch_pr_url_subprocess_no_pr(monkeypatch):
 
     monkeypatch.setattr(cli.subprocess, "run", run_side_effect)
 
-    with pytest.raises(cli.click.BadParameter, match="No open pull request found"):
+    with pytest.raises(BadParameter, match="No open pull request found"):
         cli.get_current_branch_pr_url_subprocess()
 
 
 def test_get_current_branch_pr_url_native_fallback(monkeypatch):
     """Native parser falls back to subprocess and surfaces errors."""
 
-    mock_repo = mock.MagicMock()
+    mock_repo = mock.Mock()
     mock_repo.get_repository_info.return_value = (
         "github.com",
         "owner",
@@ -948,7 +1048,7 @@ def test_get_current_branch_pr_url_native_fallback(monkeypatch):
     )
     monkeypatch.setattr(cli, "GitRepository", lambda: mock_repo)
 
-    mock_client = mock.MagicMock()
+    mock_client = mock.Mock()
     mock_client.find_pr_by_branch.side_effect = github_client.GitHubAPIError("boom")
     monkeypatch.setattr(cli, "GitHubClient", lambda token: mock_client)
 
@@ -959,14 +1059,14 @@ def test_get_current_branch_pr_url_native_fallback(monkeypatch):
 
     monkeypatch.setattr(cli.subprocess, "run", run_side_effect)
 
-    with pytest.raises(cli.click.BadParameter, match="No open pull request found"):
+    with pytest.raises(BadParameter, match="No open pull request found"):
         cli.get_current_branch_pr_url_native("token")
 
 
 def test_get_current_branch_pr_url_native_gh_cli_success(monkeypatch):
     """Native git parsing uses gh CLI when API fails."""
 
-    mock_repo = mock.MagicMock()
+    mock_repo = mock.Mock()
     mock_repo.get_repository_info.return_value = (
         "github.com",
         "owner",
@@ -975,7 +1075,7 @@ def test_get_current_branch_pr_url_native_gh_cli_success(monkeypatch):
     )
     monkeypatch.setattr(cli, "GitRepository", lambda: mock_repo)
 
-    mock_client = mock.MagicMock()
+    mock_client = mock.Mock()
     mock_client.find_pr_by_branch.side_effect = github_client.GitHubAPIError("boom")
     monkeypatch.setattr(cli, "GitHubClient", lambda token: mock_client)
 
@@ -1009,8 +1109,7 @@ def test_interactive_config_setup_new_config(tmp_path, monkeypatch):
     monkeypatch.setattr(cli.click, "confirm", lambda *a, **k: next(confirms))
     monkeypatch.setattr(cli.click, "prompt", lambda *a, **k: "new_token")
     monkeypatch.setattr(
-        cli.webbrowser,
-        "open",
+        "webbrowser.open",
         lambda *a, **k: (_ for _ in ()).throw(OSError("no browser")),
     )
     monkeypatch.setattr(
@@ -1035,7 +1134,7 @@ def test_interactive_config_setup_existing_token(tmp_path, monkeypatch):
     confirms = iter([False, False, False, False])
     monkeypatch.setattr(cli.click, "confirm", lambda *a, **k: next(confirms))
     monkeypatch.setattr(cli.click, "prompt", lambda *a, **k: "replacement")
-    monkeypatch.setattr(cli.webbrowser, "open", lambda *a, **k: None)
+    monkeypatch.setattr("webbrowser.open", lambda *a, **k: None)
     monkeypatch.setattr(cli.os, "chmod", lambda *a, **k: None)
 
     cli._interactive_config_setup()
@@ -1051,7 +1150,7 @@ def test_interactive_config_setup_open_success(tmp_path, monkeypatch):
     confirms = iter([True, True, True])
     monkeypatch.setattr(cli.click, "confirm", lambda *a, **k: next(confirms))
     monkeypatch.setattr(cli.click, "prompt", lambda *a, **k: "token")
-    monkeypatch.setattr(cli.webbrowser, "open", lambda *a, **k: None)
+    monkeypatch.setattr("webbrowser.open", lambda *a, **k: None)
     monkeypatch.setattr(cli.os, "chmod", lambda *a, **k: None)
 
     cli._interactive_config_setup()
@@ -1,7 +1,10 @@
 import pytest
+import yaml
 from pathlib import Path
 from gh_pr_rev_md import config
 
+pytestmark = pytest.mark.unit
+
 
 def test_safe_yaml_load_empty_file(tmp_path: Path) -> None:
     path = tmp_path / "config.yaml"
@@ -20,6 +23,28 @@ def test_safe_yaml_load_missing_file(tmp_path: Path) -> None:
     assert config._safe_yaml_load(path) == {}
 
 
+def test_safe_yaml_load_uses_c_loader(tmp_path: Path, monkeypatch) -> None:
+    used = []
+
+    class RecordingLoader(yaml.SafeLoader):
+        def __init__(self, stream):
+            used.append(True)
+            super().__init__(stream)
+
+    monkeypatch.setattr(yaml, "CSafeLoader", RecordingLoader, raising=False)
+    path = tmp_path / "config.yaml"
+    path.write_text("token: abc\n", encoding="utf-8")
+    assert config._safe_yaml_load(path) == {"token": "abc"}
+    assert used
+
+
+def test_safe_yaml_load_without_c_loader(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    path = tmp_path / "config.yaml"
+    path.write_text("token: abc\n", encoding="utf-8")
+    assert config._safe_yaml_load(path) == {"token": "abc"}
+
+
 def test_safe_yaml_load_invalid_yaml(tmp_path: Path) -> None:
     path = tmp_path / "config.yaml"
     path.write_text("[unclosed", encoding="utf-8")
@@ -1,7 +1,11 @@
 """Tests for markdown formatting functionality."""
 
+import pytest
+
 from gh_pr_rev_md.formatter import format_comments_as_markdown, format_timestamp
 
+pytestmark = pytest.mark.unit
+
 
 def test_format_timestamp_valid():
     """Test formatting of valid ISO timestamps."""
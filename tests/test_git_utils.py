@@ -4,6 +4,8 @@ import pytest
 
 from gh_pr_rev_md.git_utils import GitParsingError, GitRepository, RemoteInfo
 
+pytestmark = pytest.mark.unit
+
 
 class TestGitRepository:
     """Test cases for GitRepository class."""
@@ -140,6 +142,45 @@ class TestGetCurrentBranch:
         branch = repo.get_current_branch()
         assert branch == "main"
 
+    def test_get_current_branch_long_name(self, tmp_path):
+        """Test that branch names longer than one read are not truncated."""
+        repo = self.create_git_repo(tmp_path)
+        head_file = repo.git_dir / "HEAD"
+        long_branch = "feature/" + "x" * 250 + "/end"
+        head_file.write_text(f"ref: refs/heads/{long_branch}\n")
+
+        assert repo.get_current_branch() == long_branch
+
+    def test_get_current_branch_multibyte_across_reads(self, tmp_path):
+        """Test that a multi-byte character split across reads still decodes."""
+        repo = self.create_git_repo(tmp_path)
+        head_file = repo.git_dir / "HEAD"
+        # "ref: refs/heads/" is 16 bytes; pad so "é" straddles byte 256
+        branch = "a" * 239 + "é" + "b"
+        head_file.write_text(f"ref: refs/heads/{branch}", encoding="utf-8")
+
+        assert repo.get_current_branch() == branch
+
+    def test_get_current_branch_memoized(self, tmp_path):
+        """Test that HEAD is read once and reused for later lookups."""
+        repo = self.create_git_repo(tmp_path)
+        head_file = repo.git_dir / "HEAD"
+        head_file.write_text("ref: refs/heads/main")
+
+        assert repo.get_current_branch() == "main"
+        head_file.unlink()
+        assert repo.get_current_branch() == "main"
+
+    def test_get_current_branch_detached_memoized(self, tmp_path):
+        """Test that a detached HEAD (no branch) is also read only once."""
+        repo = self.create_git_repo(tmp_path)
+        head_file = repo.git_dir / "HEAD"
+        head_file.write_text("a1b2c3d4e5f6789012345678901234567890abcd")
+
+        assert repo.get_current_branch() is None
+        head_file.unlink()
+        assert repo.get_current_branch() is None
+
     def test_get_current_branch_missing_head_file(self, tmp_path):
         """Test error handling when HEAD file is missing."""
         repo = self.create_git_repo(tmp_path)
@@ -324,6 +365,93 @@ class TestGetRemoteUrl:
         with pytest.raises(GitParsingError, match="Failed to read git config"):
             repo.get_remote_url()
 
+    def test_get_remote_url_repeated_keys_and_comments(self, tmp_path):
+        """Test configs with comments and multi-valued keys like fetch."""
+        config_content = """
+# Top-level comment
+[core]
+    bare = false
+[remote "origin"]
+    ; remote comment
+    url = https://github.com/owner/repo.git
+    fetch = +refs/heads/*:refs/remotes/origin/*
+    fetch = +refs/tags/*:refs/tags/*
+"""
+        repo = self.create_git_repo_with_config(tmp_path, config_content)
+
+        url = repo.get_remote_url()
+        assert url == "https://github.com/owner/repo.git"
+
+    def test_parse_git_config_sections(self, tmp_path):
+        """Test that sections are keyed by (section, subsection)."""
+        repo = self.create_git_repo_with_config(tmp_path, "")
+
+        config = repo._parse_git_config(
+            """
+[Core]
+    Bare = false
+[branch "Feature/X"]
+    remote = upstream
+""".splitlines()
+        )
+        assert config == {
+            ("core", ""): {"bare": "false"},
+            ("branch", "Feature/X"): {"remote": "upstream"},
+        }
+
+    def test_parse_git_config_bracket_in_subsection(self, tmp_path):
+        """Test that a "]" inside a quoted subsection doesn't end the header."""
+        repo = self.create_git_repo_with_config(tmp_path, "")
+
+        config = repo._parse_git_config(
+            """
+[branch "fix]x"]
+    remote = upstream
+""".splitlines()
+        )
+        assert config == {("branch", "fix]x"): {"remote": "upstream"}}
+
+        with pytest.raises(GitParsingError, match="malformed section header"):
+            repo._parse_git_config(['[branch "unterminated]'])
+
+    def test_get_remote_url_reuses_parsed_config(self, tmp_path, monkeypatch):
+        """Test that an unchanged config file is only parsed once."""
+        config_content = """
+[remote "origin"]
+    url = https://github.com/owner/repo.git
+"""
+        repo = self.create_git_repo_with_config(tmp_path, config_content)
+        (repo.git_dir / "HEAD").write_text("ref: refs/heads/main")
+
+        calls = []
+        original_parse = repo._parse_git_config
+        monkeypatch.setattr(
+            repo,
+            "_parse_git_config",
+            lambda lines: calls.append(lines) or original_parse(lines),
+        )
+
+        assert repo.get_remote_url() == "https://github.com/owner/repo.git"
+        assert repo.get_remote_url() == "https://github.com/owner/repo.git"
+        assert len(calls) == 1
+
+    def test_get_remote_url_reparses_modified_config(self, tmp_path):
+        """Test that a modified config file is re-read."""
+        config_content = """
+[remote "origin"]
+    url = https://github.com/owner/repo.git
+"""
+        repo = self.create_git_repo_with_config(tmp_path, config_content)
+        assert repo.get_remote_url() == "https://github.com/owner/repo.git"
+
+        (repo.git_dir / "config").write_text(
+            """
+[remote "origin"]
+    url = https://github.com/other-owner/other-repo.git
+"""
+        )
+        assert repo.get_remote_url() == "https://github.com/other-owner/other-repo.git"
+
 
 class TestParseRemoteUrl:
     """Test cases for parse_remote_url method."""
@@ -1,15 +1,71 @@
 """Tests for GitHub API client functionality."""
 
+import threading
+from types import SimpleNamespace
+
 import pytest
 from unittest import mock
 
-from gh_pr_rev_md.github_client import GitHubClient, GitHubAPIError
+from gh_pr_rev_md.cache import ResponseCache
+from gh_pr_rev_md.github_client import (
+    MAX_CONCURRENT_REQUESTS,
+    THREADS_PER_REQUEST,
+    GitHubAPIError,
+    GitHubClient,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(scope="module")
+def _session_post():
+    """Patch requests.Session.post once for the whole module."""
+    with mock.patch("requests.Session.post") as patched:
+        yield patched
+
+
+@pytest.fixture(autouse=True)
+def mock_post(_session_post):
+    """The shared Session.post mock, reset to a clean state for each test."""
+    _session_post.reset_mock(return_value=True, side_effect=True)
+    return _session_post
+
+
+def test_session_uses_pooled_retrying_adapter(github_client):
+    """The session mounts a pooled adapter that retries gateway errors."""
+    adapter = github_client.session.get_adapter(github_client.graphql_url)
+    assert adapter._pool_maxsize >= MAX_CONCURRENT_REQUESTS
+    assert adapter.max_retries.total == 3
+    assert 502 in adapter.max_retries.status_forcelist
+    assert "POST" in adapter.max_retries.allowed_methods
+
+
+def test_clients_do_not_share_credentials():
+    """Each client owns its session, so a token never leaks to another client."""
+    authed = GitHubClient("tokA")
+    anonymous = GitHubClient()
+    assert authed.session is not anonymous.session
+    assert authed.session.headers["Authorization"] == "bearer tokA"
+    assert "Authorization" not in anonymous.session.headers
+
+
+def test_queries_are_minified(github_client):
+    """Queries are sent without indentation or newlines."""
+    query, _ = github_client._build_graphql_query("owner", "repo", 1, None)
+    for sent in (query, github_client._build_thread_comments_query(2)):
+        assert "\n" not in sent
+        assert "  " not in sent
+        assert "diffHunk" in sent
+
 
+def _resp(data, status_code=200, text=""):
+    """Helper to create a response with only the attributes the client reads."""
+    return SimpleNamespace(status_code=status_code, json=lambda: data, text=text)
 
-@pytest.fixture
-def github_client():
-    """Create a GitHubClient instance for testing."""
-    return GitHubClient("test_token")
+
+def _responses(*payloads):
+    """Successful responses for each payload, for use as a side_effect list."""
+    return [_resp(payload) for payload in payloads]
 
 
 def mock_graphql_response(threads):
@@ -28,212 +84,340 @@ def mock_graphql_response(threads):
     }
 
 
+# Fields every mock comment node shares; _comment_node fills in the rest
+_COMMENT_TEMPLATE = {
+    "author": {"login": "testuser"},
+    "createdAt": "2023-01-01T10:00:00Z",
+    "updatedAt": "2023-01-01T10:00:00Z",
+    "path": "file.py",
+    "diffHunk": "...",
+    "url": "...",
+    "line": 10,
+}
+
+
 def _comment_node(comment_id, body, position=1):
     """Helper to create a comment node for the mock response."""
-    return {
-        "id": comment_id,
-        "author": {"login": "testuser"},
-        "body": body,
-        "createdAt": "2023-01-01T10:00:00Z",
-        "updatedAt": "2023-01-01T10:00:00Z",
-        "path": "file.py",
-        "diffHunk": "...",
-        "position": position,
-        "url": "...",
-        "line": 10,
-    }
+    return {**_COMMENT_TEMPLATE, "id": comment_id, "body": body, "position": position}
 
 
-@mock.patch("requests.Session.post")
-def test_get_pr_review_comments_success(mock_post, github_client):
-    """Test successful retrieval of PR review comments with GraphQL."""
+# Canned responses shared by the tests below, built once at import. The
+# client never mutates response bodies.
+_RESPONSE_ONE_COMMENT = mock_graphql_response(
+    [
+        {
+            "isResolved": False,
+            "comments": {"nodes": [_comment_node("1", "Comment 1")]},
+        }
+    ]
+)
+
+_RESPONSE_MIXED_RESOLVED = mock_graphql_response(
+    [
+        {"isResolved": True, "comments": {"nodes": [_comment_node("1", "Resolved")]}},
+        {
+            "isResolved": False,
+            "comments": {"nodes": [_comment_node("2", "Not Resolved")]},
+        },
+    ]
+)
+
+_RESPONSE_MIXED_OUTDATED = mock_graphql_response(
+    [
+        {
+            "isResolved": False,
+            "comments": {
+                "nodes": [
+                    _comment_node("1", "Outdated", position=None),
+                    _comment_node("2", "Current", position=1),
+                ]
+            },
+        }
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    "response,kwargs,expected_bodies",
+    [
+        (_RESPONSE_ONE_COMMENT, {}, ["Comment 1"]),
+        (_RESPONSE_MIXED_RESOLVED, {}, ["Not Resolved"]),
+        (
+            _RESPONSE_MIXED_RESOLVED,
+            {"include_resolved": True},
+            ["Resolved", "Not Resolved"],
+        ),
+        (_RESPONSE_MIXED_OUTDATED, {}, ["Current"]),
+        (
+            _RESPONSE_MIXED_OUTDATED,
+            {"include_outdated": True},
+            ["Outdated", "Current"],
+        ),
+    ],
+    ids=[
+        "success",
+        "filter-resolved",
+        "include-resolved",
+        "filter-outdated",
+        "include-outdated",
+    ],
+)
+def test_get_pr_review_comments_filters(
+    mock_post, github_client, response, kwargs, expected_bodies
+):
+    """Resolved and outdated comments are dropped unless requested."""
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = mock_graphql_response(
-        [
-            {
-                "isResolved": False,
-                "comments": {"nodes": [_comment_node("1", "Comment 1")]},
-            }
-        ]
-    )
+    mock_post.return_value.json.return_value = response
 
-    comments = github_client.get_pr_review_comments("owner", "repo", 123)
-    assert len(comments) == 1
-    assert comments[0]["body"] == "Comment 1"
+    comments = github_client.get_pr_review_comments("owner", "repo", 123, **kwargs)
+    assert [c["body"] for c in comments] == expected_bodies
     mock_post.assert_called_once()
 
 
-@mock.patch("requests.Session.post")
-def test_filter_resolved_comments(mock_post, github_client):
-    """Test that resolved comments are filtered by default."""
+def test_get_pr_review_comments_uses_cache(mock_post, tmp_path):
+    """A cached response is reused without another request."""
+    client = GitHubClient("test_token", cache=ResponseCache(tmp_path / "c.sqlite3"))
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = mock_graphql_response(
-        [
-            {
-                "isResolved": True,
-                "comments": {"nodes": [_comment_node("1", "Resolved")]},
-            },
-            {
-                "isResolved": False,
-                "comments": {"nodes": [_comment_node("2", "Not Resolved")]},
-            },
-        ]
-    )
+    mock_post.return_value.json.return_value = _RESPONSE_ONE_COMMENT
 
-    comments = github_client.get_pr_review_comments("owner", "repo", 123)
-    assert len(comments) == 1
-    assert comments[0]["body"] == "Not Resolved"
-
-
-@mock.patch("requests.Session.post")
-def test_include_resolved_comments(mock_post, github_client):
-    """Test that resolved comments are included when requested."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = mock_graphql_response(
-        [
-            {
-                "isResolved": True,
-                "comments": {"nodes": [_comment_node("1", "Resolved")]},
-            },
-            {
-                "isResolved": False,
-                "comments": {"nodes": [_comment_node("2", "Not Resolved")]},
-            },
-        ]
-    )
+    first = client.get_pr_review_comments("owner", "repo", 123)
+    second = client.get_pr_review_comments("owner", "repo", 123)
 
-    comments = github_client.get_pr_review_comments(
-        "owner", "repo", 123, include_resolved=True
-    )
-    assert len(comments) == 2
+    assert first == second
+    mock_post.assert_called_once()
 
 
-@mock.patch("requests.Session.post")
-def test_filter_outdated_comments(mock_post, github_client):
-    """Test that outdated comments are filtered by default."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = mock_graphql_response(
+_GRAPHQL_ERROR = _resp({"errors": "Something went wrong"})
+
+
+@pytest.mark.parametrize(
+    "method,args,response,expected_message",
+    [
+        (
+            "get_pr_review_comments",
+            ("o", "r", 1),
+            _GRAPHQL_ERROR,
+            "GitHub GraphQL API error",
+        ),
+        (
+            "get_pr_review_comments",
+            ("o", "r", 1),
+            _resp(None, status_code=500, text="Server Error"),
+            "GitHub API error: 500",
+        ),
+        (
+            "find_pr_by_branch",
+            ("o", "r", "b"),
+            _GRAPHQL_ERROR,
+            "GitHub GraphQL API error",
+        ),
+        (
+            "find_pr_by_branch",
+            ("o", "r", "b"),
+            _resp(None, status_code=403, text="Forbidden"),
+            "GitHub API error: 403",
+        ),
+        (
+            "_get_additional_comments_batch",
+            ([("T1", "C1")], True),
+            _GRAPHQL_ERROR,
+            "GitHub GraphQL API error",
+        ),
+        (
+            "_get_additional_comments_batch",
+            ([("T1", "C1")], True),
+            _resp(None, status_code=500, text="boom"),
+            "GitHub API error: 500",
+        ),
+    ],
+    ids=[
+        "comments-graphql",
+        "comments-http",
+        "branch-graphql",
+        "branch-http",
+        "continuation-graphql",
+        "continuation-http",
+    ],
+)
+def test_api_errors(mock_post, github_client, method, args, response, expected_message):
+    """HTTP and GraphQL errors surface as GitHubAPIError from every entry point."""
+    mock_post.return_value = response
+
+    with pytest.raises(GitHubAPIError, match=expected_message):
+        getattr(github_client, method)(*args)
+
+
+def test_get_pr_review_comments_sorted_across_pages(monkeypatch, github_client):
+    """Comments from every thread page are returned oldest first."""
+
+    def node(comment_id, created_at):
+        comment = _comment_node(comment_id, comment_id)
+        comment["createdAt"] = created_at
+        return comment
+
+    first = mock_graphql_response(
         [
             {
                 "isResolved": False,
                 "comments": {
-                    "nodes": [
-                        _comment_node("1", "Outdated", position=None),
-                        _comment_node("2", "Current", position=1),
-                    ]
+                    "nodes": [node("a", "2023-01-03"), node("b", "2023-01-01")]
                 },
             }
         ]
     )
+    first["data"]["repository"]["pullRequest"]["reviewThreads"]["pageInfo"] = {
+        "hasNextPage": True,
+        "endCursor": "P1",
+    }
+    second = mock_graphql_response(
+        [{"isResolved": False, "comments": {"nodes": [node("c", "2023-01-02")]}}]
+    )
+    responses = iter([first, second])
+    monkeypatch.setattr(
+        github_client, "_post_graphql", lambda query, variables: next(responses)
+    )
 
     comments = github_client.get_pr_review_comments("owner", "repo", 123)
-    assert len(comments) == 1
-    assert comments[0]["body"] == "Current"
+    assert [c["id"] for c in comments] == ["b", "c", "a"]
 
 
-@mock.patch("requests.Session.post")
-def test_include_outdated_comments(mock_post, github_client):
-    """Test that outdated comments are included when requested."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = mock_graphql_response(
+def test_iter_pr_review_comments_prefetches_next_page(monkeypatch, github_client):
+    """The next thread page is requested before the current one is consumed."""
+    first = mock_graphql_response(
+        [{"isResolved": False, "comments": {"nodes": [_comment_node("a", "a")]}}]
+    )
+    first["data"]["repository"]["pullRequest"]["reviewThreads"]["pageInfo"] = {
+        "hasNextPage": True,
+        "endCursor": "P1",
+    }
+    second = mock_graphql_response(
+        [{"isResolved": False, "comments": {"nodes": [_comment_node("b", "b")]}}]
+    )
+    responses = {None: first, "P1": second}
+    second_requested = threading.Event()
+
+    def fake_post(query, variables):
+        if variables["threadsCursor"] == "P1":
+            second_requested.set()
+        return responses[variables["threadsCursor"]]
+
+    monkeypatch.setattr(github_client, "_post_graphql", fake_post)
+
+    comments = github_client.iter_pr_review_comments("owner", "repo", 123)
+    assert next(comments)["id"] == "a"
+    assert second_requested.wait(timeout=5)
+    assert [c["id"] for c in comments] == ["b"]
+
+
+def test_get_pr_review_comments_fetches_hunks_for_kept_threads(
+    monkeypatch, github_client
+):
+    """Hunks are requested by id only for comments in unresolved threads."""
+
+    def node(comment_id):
+        comment = _comment_node(comment_id, comment_id)
+        del comment["diffHunk"]
+        return comment
+
+    page = mock_graphql_response(
         [
-            {
-                "isResolved": False,
-                "comments": {
-                    "nodes": [
-                        _comment_node("1", "Outdated", position=None),
-                        _comment_node("2", "Current", position=1),
-                    ]
-                },
-            }
+            {"isResolved": True, "comments": {"nodes": [node("r")]}},
+            {"isResolved": False, "comments": {"nodes": [node("k")]}},
         ]
     )
+    hunks = {"data": {"nodes": [{"id": "k", "diffHunk": "@@ -1 +1 @@"}]}}
+    calls = []
 
-    comments = github_client.get_pr_review_comments(
-        "owner", "repo", 123, include_outdated=True
-    )
-    assert len(comments) == 2
+    def fake_post(query, variables):
+        calls.append(variables)
+        return hunks if "ids" in variables else page
 
+    monkeypatch.setattr(github_client, "_post_graphql", fake_post)
 
-@mock.patch("requests.Session.post")
-def test_graphql_api_error(mock_post, github_client):
-    """Test handling of GraphQL API errors."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"errors": "Something went wrong"}
+    comments = github_client.get_pr_review_comments("owner", "repo", 123)
 
-    with pytest.raises(GitHubAPIError) as exc_info:
-        github_client.get_pr_review_comments("owner", "repo", 123)
-    assert "GitHub GraphQL API error" in str(exc_info.value)
+    assert [c["diff_hunk"] for c in comments] == ["@@ -1 +1 @@"]
+    assert calls[0]["withHunks"] is False
+    assert calls[1] == {"ids": ["k"]}
+
+
+@pytest.mark.parametrize(
+    "hunks",
+    [
+        {"data": {"nodes": [None]}},
+        {"data": {"nodes": [{"id": "other", "diffHunk": "@@"}]}},
+        {"data": None},
+        {"data": {"nodes": [{"id": "k"}]}},
+    ],
+    ids=["null-node", "missing-id", "null-data", "missing-field"],
+)
+def test_get_pr_review_comments_incomplete_hunks_raise(
+    monkeypatch, github_client, hunks
+):
+    """A partial or malformed hunks response is an error, not empty hunks."""
+    comment = _comment_node("k", "k")
+    del comment["diffHunk"]
+    page = mock_graphql_response(
+        [{"isResolved": False, "comments": {"nodes": [comment]}}]
+    )
 
+    def fake_post(query, variables):
+        return hunks if "ids" in variables else page
 
-@mock.patch("requests.Session.post")
-def test_http_error(mock_post, github_client):
-    """Test handling of HTTP errors."""
-    mock_post.return_value.status_code = 500
-    mock_post.return_value.text = "Server Error"
+    monkeypatch.setattr(github_client, "_post_graphql", fake_post)
 
-    with pytest.raises(GitHubAPIError) as exc_info:
+    with pytest.raises(GitHubAPIError):
         github_client.get_pr_review_comments("owner", "repo", 123)
-    assert "GitHub API error: 500" in str(exc_info.value)
 
 
-# --- Tests for find_pr_by_branch method ---
+def test_filter_comments_formats_nodes(github_client):
+    """Test comment nodes are mapped to REST-style keys with side inferred."""
+    outdated = _comment_node("2", "Old", position=None)
+    outdated["author"] = None
+    nodes = [_comment_node("1", "Current"), outdated]
 
+    current_only = github_client._filter_comments(nodes, include_outdated=False)
+    assert [c["id"] for c in current_only] == ["1"]
+    assert current_only[0]["user"] == {"login": "testuser"}
+    assert current_only[0]["created_at"] == "2023-01-01T10:00:00Z"
+    assert current_only[0]["html_url"] == "..."
+    assert current_only[0]["side"] == "RIGHT"
 
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_success(mock_post, github_client):
-    """Test successful finding of PR by branch name."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {
-        "data": {
-            "repository": {
-                "pullRequests": {
-                    "nodes": [
-                        {
-                            "number": 123,
-                            "headRefName": "feature-branch",
-                            "state": "OPEN",
-                        },
-                        {
-                            "number": 456,
-                            "headRefName": "another-branch",
-                            "state": "OPEN",
-                        },
-                    ]
-                }
-            }
-        }
-    }
+    everything = github_client._filter_comments(nodes, include_outdated=True)
+    assert everything[1]["user"] == {"login": None}
+    assert everything[1]["side"] == "LEFT"
 
-    pr_number = github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert pr_number == 123
 
+# --- Tests for find_pr_by_branch method ---
 
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_no_match(mock_post, github_client):
-    """Test finding PR by branch name when no matching PR exists."""
+
+def _pr_node(number, branch, state="OPEN"):
+    """Helper to create a pullRequests node for find_pr_by_branch responses."""
+    return {"number": number, "headRefName": branch, "state": state}
+
+
+@pytest.mark.parametrize(
+    "nodes,expected",
+    [
+        ([_pr_node(123, "feature-branch"), _pr_node(456, "another-branch")], 123),
+        ([_pr_node(123, "different-branch")], None),
+        ([_pr_node(123, "feature-branch", state="CLOSED")], None),
+        ([_pr_node(123, "feature-branch"), _pr_node(456, "feature-branch")], 123),
+        ([], None),
+    ],
+    ids=["match", "no-match", "closed", "first-of-several", "empty"],
+)
+def test_find_pr_by_branch(mock_post, github_client, nodes, expected):
+    """Only open PRs for the branch match, and the first match wins."""
     mock_post.return_value.status_code = 200
     mock_post.return_value.json.return_value = {
-        "data": {
-            "repository": {
-                "pullRequests": {
-                    "nodes": [
-                        {
-                            "number": 123,
-                            "headRefName": "different-branch",
-                            "state": "OPEN",
-                        },
-                    ]
-                }
-            }
-        }
+        "data": {"repository": {"pullRequests": {"nodes": nodes}}}
     }
 
     pr_number = github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert pr_number is None
+    assert pr_number == expected
 
 
-@mock.patch("requests.Session.post")
 def test_get_pr_review_comments_pr_not_found(mock_post, github_client):
     """PR absence triggers a specific API error."""
 
@@ -246,16 +430,24 @@ def test_get_pr_review_comments_pr_not_found(mock_post, github_client):
         github_client.get_pr_review_comments("o", "r", 1)
 
 
-@mock.patch("requests.Session.post")
-def test_get_pr_review_comments_thread_pagination(mock_post, github_client):
-    """Thread pagination is followed using cursors."""
+def test_get_pr_review_comments_no_threads(monkeypatch, github_client):
+    """A PR without review threads returns as soon as totalCount is seen."""
+    response = mock_graphql_response([])
+    response["data"]["repository"]["pullRequest"]["reviewThreads"]["totalCount"] = 0
+    post = mock.Mock(return_value=response)
+    monkeypatch.setattr(github_client, "_post_graphql", post)
+    monkeypatch.setattr(
+        github_client,
+        "_get_threads_comments",
+        mock.Mock(side_effect=AssertionError("threads should not be processed")),
+    )
 
-    def make_response(data):
-        resp = mock.Mock()
-        resp.status_code = 200
-        resp.json.return_value = data
-        return resp
+    assert github_client.get_pr_review_comments("owner", "repo", 123) == []
+    post.assert_called_once()
 
+
+def test_get_pr_review_comments_thread_pagination(mock_post, github_client):
+    """Thread pagination is followed using cursors."""
     first_page = {
         "data": {
             "repository": {
@@ -282,15 +474,15 @@ def test_get_pr_review_comments_thread_pagination(mock_post, github_client):
         }
     }
 
-    mock_post.side_effect = [make_response(first_page), make_response(second_page)]
+    mock_post.side_effect = _responses(first_page, second_page)
 
     comments = github_client.get_pr_review_comments("o", "r", 1)
     assert comments == []
     assert mock_post.call_count == 2
 
 
-def test_get_all_thread_comments_paginates(monkeypatch, github_client):
-    """_get_all_thread_comments should request additional pages when needed."""
+def test_get_threads_comments_paginates(monkeypatch, github_client):
+    """_get_threads_comments should request additional pages when needed."""
 
     thread = {
         "id": "T1",
@@ -303,59 +495,102 @@ def test_get_all_thread_comments_paginates(monkeypatch, github_client):
 
     monkeypatch.setattr(
         github_client,
-        "_get_additional_thread_comments",
-        lambda thread_id, cursor, include_outdated: [
-            {
-                "id": "c2",
-                "user": {"login": "u"},
-                "body": "b",
-                "created_at": "0",
-                "updated_at": "0",
-                "path": "p",
-                "diff_hunk": "h",
-                "line": 1,
-                "position": 1,
-                "html_url": "u",
-                "side": "RIGHT",
-            }
-        ],
+        "_get_additional_comments",
+        lambda pending, include_outdated: {
+            "T1": [
+                {
+                    "id": "c2",
+                    "user": {"login": "u"},
+                    "body": "b",
+                    "created_at": "0",
+                    "updated_at": "0",
+                    "path": "p",
+                    "diff_hunk": "h",
+                    "line": 1,
+                    "position": 1,
+                    "html_url": "u",
+                    "side": "RIGHT",
+                }
+            ]
+        },
     )
 
-    comments = github_client._get_all_thread_comments(
-        thread, "o", "r", 1, include_outdated=True
-    )
+    comments = github_client._get_threads_comments([thread], include_outdated=True)
     assert len(comments) == 1
 
 
-@mock.patch("requests.Session.post")
-def test_get_additional_thread_comments_pagination_and_filter(mock_post, github_client):
-    """Additional comments pagination continues until complete and filters outdated."""
+def test_get_pr_review_comments_batches_thread_pagination(mock_post, github_client):
+    """Extra comment pages for several threads share one aliased request."""
+    threads = [
+        {
+            "id": f"T{i}",
+            "isResolved": False,
+            "comments": {
+                "nodes": [_comment_node(f"{i}a", f"Thread {i} first")],
+                "pageInfo": {"hasNextPage": True, "endCursor": f"C{i}"},
+            },
+        }
+        for i in range(3)
+    ]
+    continuation = {
+        "data": {
+            f"thread{i}": {
+                "comments": {
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "nodes": [_comment_node(f"{i}b", f"Thread {i} more")],
+                }
+            }
+            for i in range(3)
+        }
+    }
+    mock_post.side_effect = _responses(mock_graphql_response(threads), continuation)
 
-    def make_response(data):
-        resp = mock.Mock()
-        resp.status_code = 200
-        resp.json.return_value = data
-        return resp
+    comments = github_client.get_pr_review_comments("o", "r", 1)
+    assert [c["body"] for c in comments] == [
+        "Thread 0 first",
+        "Thread 0 more",
+        "Thread 1 first",
+        "Thread 1 more",
+        "Thread 2 first",
+        "Thread 2 more",
+    ]
+    assert mock_post.call_count == 2
+    variables = mock_post.call_args.kwargs["json"]["variables"]
+    assert variables == {
+        "thread0": "T0",
+        "cursor0": "C0",
+        "thread1": "T1",
+        "cursor1": "C1",
+        "thread2": "T2",
+        "cursor2": "C2",
+    }
+
+
+def test_get_additional_comments_splits_batches(monkeypatch, github_client):
+    """More threads than fit in one query are split across batches."""
+    batches = []
+
+    def fake_batch(batch, include_outdated):
+        batches.append(batch)
+        return {thread_id: [{"body": thread_id}] for thread_id, _ in batch}
+
+    monkeypatch.setattr(github_client, "_get_additional_comments_batch", fake_batch)
 
+    pending = [(f"T{i}", f"C{i}") for i in range(THREADS_PER_REQUEST + 1)]
+    result = github_client._get_additional_comments(pending, False)
+
+    assert sorted(len(batch) for batch in batches) == [1, THREADS_PER_REQUEST]
+    assert list(result) == [thread_id for thread_id, _ in pending]
+
+
+def test_get_additional_comments_batch_pagination_and_filter(mock_post, github_client):
+    """Additional comments pagination continues until complete and filters outdated."""
     first = {
         "data": {
-            "node": {
+            "thread0": {
                 "comments": {
                     "pageInfo": {"hasNextPage": True, "endCursor": "C2"},
-                    "nodes": [
-                        {
-                            "id": "c1",
-                            "author": {"login": "u"},
-                            "body": "old",
-                            "createdAt": "0",
-                            "updatedAt": "0",
-                            "path": "p",
-                            "diffHunk": "h",
-                            "position": None,
-                            "url": "u",
-                            "line": 1,
-                        }
-                    ],
+                    "nodes": [_comment_node("c1", "old", position=None)],
                 }
             }
         }
@@ -363,138 +598,122 @@ def test_get_additional_thread_comments_pagination_and_filter(mock_post, github_
 
     second = {
         "data": {
-            "node": {
+            "thread0": {
                 "comments": {
                     "pageInfo": {"hasNextPage": False, "endCursor": None},
-                    "nodes": [
-                        {
-                            "id": "c2",
-                            "author": {"login": "u"},
-                            "body": "new",
-                            "createdAt": "0",
-                            "updatedAt": "0",
-                            "path": "p",
-                            "diffHunk": "h",
-                            "position": 1,
-                            "url": "u",
-                            "line": 1,
-                        }
-                    ],
+                    "nodes": [_comment_node("c2", "new")],
                 }
             }
         }
     }
 
-    mock_post.side_effect = [make_response(first), make_response(second)]
-
-    comments = github_client._get_additional_thread_comments("T1", "C1", False)
-    assert len(comments) == 1
-
+    mock_post.side_effect = _responses(first, second)
 
-@mock.patch("requests.Session.post")
-def test_get_additional_thread_comments_http_error(mock_post, github_client):
-    """HTTP errors in pagination raise GitHubAPIError."""
+    comments = github_client._get_additional_comments_batch([("T1", "C1")], False)
+    assert [c["body"] for c in comments["T1"]] == ["new"]
+    assert mock_post.call_count == 2
 
-    mock_post.return_value.status_code = 500
-    mock_post.return_value.text = "boom"
 
-    with pytest.raises(GitHubAPIError):
-        github_client._get_additional_thread_comments("T1", "C1", True)
+def test_get_additional_comments_batch_null_thread_is_skipped(mock_post, github_client):
+    """A continuation thread that no longer resolves contributes no comments."""
+    mock_post.side_effect = _responses({"data": {"thread0": None}})
 
+    comments = github_client._get_additional_comments_batch([("T1", "C1")], False)
+    assert comments == {"T1": []}
 
-@mock.patch("requests.Session.post")
-def test_get_additional_thread_comments_graphql_error(mock_post, github_client):
-    """GraphQL errors in pagination raise GitHubAPIError."""
 
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"errors": "nope"}
+@pytest.mark.parametrize(
+    "payload",
+    [{"data": None}, {"data": {}}, {"data": {"thread0": {"comments": {}}}}],
+    ids=["null-data", "missing-alias", "missing-fields"],
+)
+def test_get_additional_comments_batch_malformed_response(
+    mock_post, github_client, payload
+):
+    """A malformed continuation response raises instead of dropping comments."""
+    mock_post.side_effect = _responses(payload)
 
-    with pytest.raises(GitHubAPIError):
-        github_client._get_additional_thread_comments("T1", "C1", True)
+    with pytest.raises(GitHubAPIError, match="Malformed review comments response"):
+        github_client._get_additional_comments_batch([("T1", "C1")], False)
 
 
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_closed_pr(mock_post, github_client):
-    """Test finding PR by branch name ignores closed PRs."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {
+def test_get_pr_by_branch_with_threads_seeds_first_page(monkeypatch, github_client):
+    """The fused branch lookup's threads page is reused for the comments."""
+    threads_page = mock_graphql_response(
+        [{"isResolved": False, "comments": {"nodes": [_comment_node("1", "Hi")]}}]
+    )["data"]["repository"]["pullRequest"]["reviewThreads"]
+    fused = {
         "data": {
             "repository": {
                 "pullRequests": {
                     "nodes": [
                         {
-                            "number": 123,
+                            "number": 7,
                             "headRefName": "feature-branch",
-                            "state": "CLOSED",
-                        },
+                            "state": "OPEN",
+                            "reviewThreads": threads_page,
+                        }
                     ]
                 }
             }
         }
     }
+    calls = []
 
-    pr_number = github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert pr_number is None
+    def fake_post(query, variables, cacheable=True):
+        calls.append(variables)
+        return fused
 
+    monkeypatch.setattr(github_client, "_post_graphql", fake_post)
 
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_multiple_matches(mock_post, github_client):
-    """Test finding PR by branch name returns first match when multiple exist."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {
-        "data": {
-            "repository": {
-                "pullRequests": {
-                    "nodes": [
-                        {
-                            "number": 123,
-                            "headRefName": "feature-branch",
-                            "state": "OPEN",
-                        },
-                        {
-                            "number": 456,
-                            "headRefName": "feature-branch",
-                            "state": "OPEN",
-                        },
-                    ]
+    pr_number = github_client.get_pr_by_branch_with_threads(
+        "owner", "repo", "feature-branch"
+    )
+    comments = github_client.get_pr_review_comments("owner", "repo", pr_number)
+
+    assert pr_number == 7
+    assert [c["body"] for c in comments] == ["Hi"]
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "seed_resolved,fetch_resolved,expected_requests",
+    [(True, True, 1), (False, False, 2), (False, True, 2)],
+    ids=["with-hunks", "hunks-fetched-after", "mismatched-seed-refetched"],
+)
+def test_get_pr_by_branch_with_threads_matches_hunk_selection(
+    monkeypatch, github_client, seed_resolved, fetch_resolved, expected_requests
+):
+    """The seeded page selects hunks the way the comment fetch will."""
+    requests_sent = []
+
+    def fake_post(query, variables, cacheable=True):
+        requests_sent.append(variables)
+        if "ids" in variables:
+            return {
+                "data": {
+                    "nodes": [{"id": i, "diffHunk": "@@"} for i in variables["ids"]]
                 }
             }
-        }
-    }
-
-    pr_number = github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert pr_number == 123  # Should return the first match
-
-
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_api_error(mock_post, github_client):
-    """Test handling of API errors in find_pr_by_branch."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"errors": "Something went wrong"}
-
-    with pytest.raises(GitHubAPIError) as exc_info:
-        github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert "GitHub GraphQL API error" in str(exc_info.value)
-
-
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_http_error(mock_post, github_client):
-    """Test handling of HTTP errors in find_pr_by_branch."""
-    mock_post.return_value.status_code = 403
-    mock_post.return_value.text = "Forbidden"
-
-    with pytest.raises(GitHubAPIError) as exc_info:
-        github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert "GitHub API error: 403" in str(exc_info.value)
-
-
-@mock.patch("requests.Session.post")
-def test_find_pr_by_branch_empty_response(mock_post, github_client):
-    """Test finding PR by branch name with empty response."""
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {
-        "data": {"repository": {"pullRequests": {"nodes": []}}}
-    }
+        comment = _comment_node("1", "Hi")
+        if not variables["withHunks"]:
+            del comment["diffHunk"]
+        threads = mock_graphql_response(
+            [{"isResolved": False, "comments": {"nodes": [comment]}}]
+        )["data"]["repository"]["pullRequest"]["reviewThreads"]
+        if "branchName" in variables:
+            pr = {**_pr_node(7, "b"), "reviewThreads": threads}
+            return {"data": {"repository": {"pullRequests": {"nodes": [pr]}}}}
+        return {"data": {"repository": {"pullRequest": {"reviewThreads": threads}}}}
+
+    monkeypatch.setattr(github_client, "_post_graphql", fake_post)
+
+    pr_number = github_client.get_pr_by_branch_with_threads(
+        "o", "r", "b", include_resolved=seed_resolved
+    )
+    comments = github_client.get_pr_review_comments(
+        "o", "r", pr_number, include_resolved=fetch_resolved
+    )
 
-    pr_number = github_client.find_pr_by_branch("owner", "repo", "feature-branch")
-    assert pr_number is None
+    assert [c["diff_hunk"] for c in comments] == ["..." if fetch_resolved else "@@"]
+    assert len(requests_sent) == expected_requests